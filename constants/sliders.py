@@ -0,0 +1,10 @@
+# Grenzen van de sidebar sliders (ook gebruikt door de parameter optimizer)
+SLIDER_BOUNDS = {
+    'corr_window': dict(min_value=5, max_value=60, value=20, step=1),
+    'zscore_entry': dict(min_value=1.0, max_value=5.0, value=2.0, step=0.1),
+    'zscore_exit': dict(min_value=0.0, max_value=2.0, value=0.5, step=0.1),
+    'transaction_cost': dict(min_value=0.0, max_value=1.0, value=0.1, step=0.01),
+    'max_position': dict(min_value=10, max_value=100, value=50, step=10),
+    'stop_loss': dict(min_value=0.0, max_value=20.0, value=5.0, step=0.5),
+    'take_profit': dict(min_value=0.0, max_value=50.0, value=10.0, step=1.0)
+}
@@ -3,9 +3,16 @@ from pathlib import Path
 import sys
 from constants.tickers import tickers
 from pages.sidebar import show as sidebar_ui
-from utils.data_loader import load_data, preprocess_data
+from utils.data_loader import fetch_data, preprocess_data
+from utils.regression import fit_ols
+from utils.shared_resources import get_shared_resources, current_session_id
+from utils.backtest_cache import data_fingerprint
+from utils.trade_ledger import get_trade_ledger
 from pages.analysis import show as show_analysis
-from pages.backtesting import show as show_backtest
+
+# Prijsdata wordt op de achtergrond ververst (zie TimeframeStore); de
+# gedeelde kopie kijkt elke minuut goedkoop of er een nieuwer frame is
+PRICE_TTL = 60
 
 # Configuratie
 def setup():
@@ -13,9 +20,6 @@ def setup():
     # Pad configuratie
     sys.path.append(str(Path(__file__).parent.parent))
     
-    # Cache leegmaken
-    st.cache_data.clear()
-    
     # Pagina config
     st.set_page_config(
         layout="wide",
@@ -26,16 +30,31 @@ def setup():
 def load_and_prepare_data(params):
     """Garandeer dat alle benodigde kolommen aanwezig zijn"""
     try:
-        # Data laden
-        data1 = load_data(params['coin1'], params['period'], params['interval'])
-        data2 = load_data(params['coin2'], params['period'], params['interval'])
+        # Gedeelde (read-only) resources over alle sessies heen
+        shared = get_shared_resources()
+        session_id = current_session_id()
+        source = (params['period'], params['interval'])
+        
+        keys = {
+            'data1': ('prices', params['coin1']) + source,
+            'data2': ('prices', params['coin2']) + source
+        }
+        
+        # Data laden (blokkeert alleen bij de eerste fetch van een ticker)
+        data1 = shared.get(keys['data1'], lambda: fetch_data(params['coin1'], *source), session_id, ttl=PRICE_TTL)
+        data2 = shared.get(keys['data2'], lambda: fetch_data(params['coin2'], *source), session_id, ttl=PRICE_TTL)
         
         if data1.empty or data2.empty:
             st.error("Ontbrekende data voor één of beide assets")
             st.stop()
+        
+        # Afgeleide resources horen bij een specifieke versie van de prijsdata
+        versions = (shared.version(keys['data1']), shared.version(keys['data2']))
+        keys['pair'] = ('pair', params['coin1'], params['coin2']) + source + versions
+        keys['model'] = ('model', params['coin1'], params['coin2']) + source + versions
             
         # Data verwerken (inclusief z-score berekening)
-        df = preprocess_data(data1, data2)
+        df = shared.get(keys['pair'], lambda: preprocess_data(data1, data2), session_id)
         
         # Controleer kritieke kolommen
         required_columns = ['price1', 'price2', 'spread', 'zscore']
@@ -43,13 +62,37 @@ def load_and_prepare_data(params):
             missing = [col for col in required_columns if col not in df.columns]
             st.error(f"Ontbrekende kolommen in data: {', '.join(missing)}")
             st.stop()
+        
+        # Gefit spread model delen met andere sessies op hetzelfde pair
+        model = shared.get(keys['model'], lambda: fit_ols(df['price1'].values, df['price2'].values), session_id)
+        
+        # Resources van een vorige selectie vrijgeven
+        shared.release(session_id, keep=keys.values())
             
-        return df
+        return df, model
         
     except Exception as e:
         st.error(f"Data voorbereidingsfout: {str(e)}")
         st.stop()
 
+def record_backtest(params, backtest_params, df, df_backtest, trades):
+    """Sla de backtest run op in de trade ledger (True als dat gelukt is)"""
+    try:
+        get_trade_ledger().record_run(
+            params['coin1'],
+            params['coin2'],
+            backtest_params,
+            data_fingerprint(df),
+            df_backtest,
+            trades,
+            period=params['period'],
+            interval=params['interval']
+        )
+    except Exception as e:
+        st.warning(f"Backtest niet opgeslagen in ledger: {str(e)}")
+        return False
+    return True
+
 def main():
     """Hoofdapplicatie"""
     setup()
@@ -60,12 +103,13 @@ def main():
         params = sidebar_ui(tickers)
         
         # Data pipeline
-        df = load_and_prepare_data(params)
+        df, model = load_and_prepare_data(params)
         
         # Verpak data en parameters voor analyse
         analysis_data = {
             'df': df,
-            'params': params
+            'params': params,
+            'model': model
         }
         
         # Toon analyse
@@ -73,10 +117,25 @@ def main():
         
         # Optionele backtest
         if params.get('run_backtest', False):
+            # Backtest module pas laden wanneer nodig
+            from pages.backtesting import show as show_backtest, cached_run_backtest, backtest_params
+            run_params = backtest_params(params)
             with st.spinner("Backtest uitvoeren..."):
-                backtest_results = show_backtest(analysis_data)
-                if backtest_results:
-                    st.success("Backtest voltooid!")
+                # Ledger schrijven tot het één keer gelukt is, ook bij cache hits
+                df_backtest, trades = cached_run_backtest(
+                    df.copy(), **run_params,
+                    record=lambda result, result_trades: record_backtest(params, run_params, df, result, result_trades)
+                )
+                show_backtest(df_backtest, trades)
+                st.success("Backtest voltooid!")
+            
+            from pages.optimizer import show as show_optimizer
+            show_optimizer(df, params)
+        
+        # Optioneel jobs paneel (sweeps en scans in de achtergrond)
+        if params.get('show_jobs', False):
+            from pages.jobs import show as show_jobs
+            show_jobs(df, params, tickers)
                     
     except Exception as e:
         st.error(f"Er is een onverwachte fout opgetreden: {str(e)}")
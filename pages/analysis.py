@@ -1,8 +1,13 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
+from datetime import datetime
+from utils.regression import fit_ols
+from utils.signals import classify_signal, LONG, SHORT, EXIT
+from utils.backtest_cache import data_fingerprint
+from utils.figure_cache import get_figure_cache
+
+# Plotly wordt pas binnen de grafiekfuncties geladen (snellere cold start)
 
 def show(data_and_params):
     """Voeg debug checks toe"""
@@ -20,6 +25,10 @@ def show(data_and_params):
     df = data_and_params['df']
     params = data_and_params['params']
     
+    # Afgeleide statistieken voor grafieken en metrics
+    df = add_analysis_columns(df, params['corr_window'])
+    store_analysis_state(df, params, data_and_params.get('model'))
+    
     """Toon de huidige analyse sectie"""
     st.header("📊 Huidige Analyse")
     
@@ -28,14 +37,40 @@ def show(data_and_params):
     st.subheader("🚦 Huidige Trade Signaal")
     st.write(f"**Z-score laatste waarde:** {current_zscore:.2f}")
     
-    # Toon grafieken
-    show_spread_chart(df)
-    show_price_and_zscore_charts(df)
+    # Toon grafieken (hergebruikt uit de figuur cache als data en instellingen gelijk zijn)
+    fingerprint = data_fingerprint(df)
+    show_spread_chart(df, fingerprint)
+    show_price_and_zscore_charts(df, fingerprint)
     show_correlation_stats(df)
     
     # Export functionaliteit
     show_export_options(df)
 
+def add_analysis_columns(df, corr_window):
+    """Voeg returns en rolling correlatie toe (nieuwe DataFrame, origineel blijft gedeeld)"""
+    returns1 = df['price1'].pct_change()
+    returns2 = df['price2'].pct_change()
+    return df.assign(
+        returns1=returns1,
+        returns2=returns2,
+        rolling_corr=returns1.rolling(corr_window).corr(returns2)
+    )
+
+def store_analysis_state(df, params, model=None):
+    """Zet de waarden die de grafieken en metrics uit session state lezen"""
+    if model is None:
+        model = fit_ols(df['price1'].values, df['price2'].values)
+    
+    st.session_state.zscore_entry_threshold = params['zscore_entry']
+    st.session_state.zscore_exit_threshold = params['zscore_exit']
+    st.session_state.spread_mean = df['spread'].mean()
+    st.session_state.spread_std = df['spread'].std()
+    st.session_state.pearson_corr = df['price1'].corr(df['price2'])
+    st.session_state.returns_corr = df['returns1'].corr(df['returns2'])
+    st.session_state.alpha = model['alpha']
+    st.session_state.beta = model['beta']
+    st.session_state.r_squared = model['r_squared']
+
 def show_current_signal(df):
     """Toon het huidige trading signaal"""
     st.subheader("🚦 Huidige Trade Signaal")
@@ -52,11 +87,16 @@ def show_current_signal(df):
 
 def get_current_position(df):
     """Bepaal het huidige trading signaal"""
-    if df['long_entry'].iloc[-1]:
+    signal = classify_signal(
+        df['zscore'].iloc[-1],
+        st.session_state.zscore_entry,
+        st.session_state.zscore_exit
+    )
+    if signal == LONG:
         return f"Long Spread (koop {st.session_state.name2}, verkoop {st.session_state.name1})"
-    elif df['short_entry'].iloc[-1]:
+    elif signal == SHORT:
         return f"Short Spread (verkoop {st.session_state.name2}, koop {st.session_state.name1})"
-    elif df['exit'].iloc[-1]:
+    elif signal == EXIT:
         return "Exit positie (geen trade)"
     return "Geen duidelijk signaal"
 
@@ -70,10 +110,22 @@ def get_signal_explanation(position):
         return "De spread is terug bij het gemiddelde, tijd om posities te sluiten."
     return "De spread is binnen normale bereik, wacht op een signaal."
 
-def show_spread_chart(df):
+def show_spread_chart(df, fingerprint=None):
     """Toon de spread chart met trading niveaus"""
     st.subheader("📈 Spread Analyse")
     
+    key = (
+        fingerprint or data_fingerprint(df),
+        st.session_state.zscore_entry_threshold,
+        st.session_state.zscore_exit_threshold
+    )
+    fig = get_figure_cache().get_or_build('spread', key, lambda: build_spread_chart(df))
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_spread_chart(df):
+    """Bouw de spread chart met trading niveaus"""
+    import plotly.graph_objects as go
+    
     # Bereken niveaus
     entry_long_level = -st.session_state.zscore_entry_threshold * st.session_state.spread_std + st.session_state.spread_mean
     entry_short_level = st.session_state.zscore_entry_threshold * st.session_state.spread_std + st.session_state.spread_mean
@@ -138,95 +190,117 @@ def show_spread_chart(df):
         height=600
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def show_price_and_zscore_charts(df):
+def show_price_and_zscore_charts(df, fingerprint=None):
     """Toon de prijs en z-score grafieken naast elkaar"""
     st.subheader("📉 Prijs- en Z-score Analyse")
     col1, col2 = st.columns(2)
+    fingerprint = fingerprint or data_fingerprint(df)
+    cache = get_figure_cache()
     
     with col1:
-        # Prijsgrafiek
-        fig_prices = go.Figure()
-        
-        fig_prices.add_trace(go.Scatter(
-            x=df.index,
-            y=df['price1'],
-            name=st.session_state.name1,
-            line=dict(color='#00CC96')
-        ))
-        
-        fig_prices.add_trace(go.Scatter(
-            x=df.index,
-            y=df['price2'],
-            name=st.session_state.name2,
-            line=dict(color='#EF553B'),
-            yaxis='y2'
-        ))
-        
-        fig_prices.update_layout(
-            title="Genormaliseerde Prijzen",
-            xaxis_title="Datum",
-            yaxis_title=f"{st.session_state.name1} Prijs (USD)",
-            yaxis2=dict(
-                title=f"{st.session_state.name2} Prijs (USD)",
-                overlaying='y',
-                side='right'
-            ),
-            height=400
+        fig_prices = cache.get_or_build(
+            'prices',
+            (fingerprint, st.session_state.name1, st.session_state.name2),
+            lambda: build_price_chart(df)
         )
-        
         st.plotly_chart(fig_prices, use_container_width=True)
     
     with col2:
-        # Z-score grafiek
-        fig_zscore = go.Figure()
-        
-        fig_zscore.add_trace(go.Scatter(
-            x=df.index,
-            y=df['zscore'],
-            name='Z-score',
-            line=dict(color='#AB63FA')
-        ))
-        
-        # Voeg trading niveaus toe
-        fig_zscore.add_hline(
-            y=st.session_state.zscore_entry_threshold,
-            line=dict(color='red', dash='dash'),
-            annotation_text='Short Entry',
-            annotation_position='top right'
+        fig_zscore = cache.get_or_build(
+            'zscore',
+            (fingerprint, st.session_state.zscore_entry_threshold, st.session_state.zscore_exit_threshold),
+            lambda: build_zscore_chart(df)
         )
-        
-        fig_zscore.add_hline(
-            y=-st.session_state.zscore_entry_threshold,
-            line=dict(color='green', dash='dash'),
-            annotation_text='Long Entry',
-            annotation_position='bottom right'
-        )
-        
-        fig_zscore.add_hline(
-            y=st.session_state.zscore_exit_threshold,
-            line=dict(color='blue', dash='dot'),
-            annotation_text='Exit',
-            annotation_position='top right'
-        )
-        
-        fig_zscore.add_hline(
-            y=-st.session_state.zscore_exit_threshold,
-            line=dict(color='blue', dash='dot'),
-            annotation_text='Exit',
-            annotation_position='bottom right'
-        )
-        
-        fig_zscore.update_layout(
-            title="Z-score Evolutie",
-            yaxis_title="Z-score",
-            xaxis_title="Datum",
-            height=400
-        )
-        
         st.plotly_chart(fig_zscore, use_container_width=True)
 
+def build_price_chart(df):
+    """Bouw de prijsgrafiek van beide assets"""
+    import plotly.graph_objects as go
+    
+    fig_prices = go.Figure()
+    
+    fig_prices.add_trace(go.Scatter(
+        x=df.index,
+        y=df['price1'],
+        name=st.session_state.name1,
+        line=dict(color='#00CC96')
+    ))
+    
+    fig_prices.add_trace(go.Scatter(
+        x=df.index,
+        y=df['price2'],
+        name=st.session_state.name2,
+        line=dict(color='#EF553B'),
+        yaxis='y2'
+    ))
+    
+    fig_prices.update_layout(
+        title="Genormaliseerde Prijzen",
+        xaxis_title="Datum",
+        yaxis_title=f"{st.session_state.name1} Prijs (USD)",
+        yaxis2=dict(
+            title=f"{st.session_state.name2} Prijs (USD)",
+            overlaying='y',
+            side='right'
+        ),
+        height=400
+    )
+    
+    return fig_prices
+
+def build_zscore_chart(df):
+    """Bouw de z-score grafiek met trading niveaus"""
+    import plotly.graph_objects as go
+    
+    fig_zscore = go.Figure()
+    
+    fig_zscore.add_trace(go.Scatter(
+        x=df.index,
+        y=df['zscore'],
+        name='Z-score',
+        line=dict(color='#AB63FA')
+    ))
+    
+    # Voeg trading niveaus toe
+    fig_zscore.add_hline(
+        y=st.session_state.zscore_entry_threshold,
+        line=dict(color='red', dash='dash'),
+        annotation_text='Short Entry',
+        annotation_position='top right'
+    )
+    
+    fig_zscore.add_hline(
+        y=-st.session_state.zscore_entry_threshold,
+        line=dict(color='green', dash='dash'),
+        annotation_text='Long Entry',
+        annotation_position='bottom right'
+    )
+    
+    fig_zscore.add_hline(
+        y=st.session_state.zscore_exit_threshold,
+        line=dict(color='blue', dash='dot'),
+        annotation_text='Exit',
+        annotation_position='top right'
+    )
+    
+    fig_zscore.add_hline(
+        y=-st.session_state.zscore_exit_threshold,
+        line=dict(color='blue', dash='dot'),
+        annotation_text='Exit',
+        annotation_position='bottom right'
+    )
+    
+    fig_zscore.update_layout(
+        title="Z-score Evolutie",
+        yaxis_title="Z-score",
+        xaxis_title="Datum",
+        height=400
+    )
+    
+    return fig_zscore
+
 def show_correlation_stats(df):
     """Toon correlatie statistieken"""
     st.subheader("📊 Correlatie Statistieken")
@@ -265,7 +339,7 @@ def show_export_options(df):
         # Voeg belangrijke statistieken toe als metadata
         metadata = {
             'pair': f"{st.session_state.name1}_{st.session_state.name2}",
-            'period': st.session_state.periode,
+            'period': st.session_state.period,
             'interval': st.session_state.interval,
             'alpha': st.session_state.alpha,
             'beta': st.session_state.beta,
@@ -1,27 +1,54 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from utils.backtest import run_backtest, cached_run_backtest, backtest_metrics, add_spread_columns  # noqa: F401 (her-export)
+from utils.backtest_cache import data_fingerprint
+from utils.figure_cache import get_figure_cache
+
+# Plotly wordt pas binnen de grafiekfuncties geladen; de backtest zelf
+# staat in utils/backtest.py zodat workers streamlit niet hoeven te laden
+
+TRADE_COLUMNS = [
+    'Entry Date', 'Exit Date', 'Position',
+    'P&L', 'P&L %', 'Position Size',
+    'Exit Reason', 'Days Held'
+]
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# run_backtest parameter -> sidebar parameter
+SIDEBAR_PARAMS = {
+    'entry_threshold': 'zscore_entry',
+    'exit_threshold': 'zscore_exit',
+    'initial_capital': 'initial_capital',
+    'transaction_cost': 'transaction_cost',
+    'max_position_size': 'max_position',
+    'stop_loss_pct': 'stop_loss',
+    'take_profit_pct': 'take_profit'
+}
+
+def backtest_params(params):
+    """run_backtest keyword argumenten uit de sidebar parameters"""
+    return {name: params[key] for name, key in SIDEBAR_PARAMS.items()}
 
 def show(df_backtest, trades):
     """Toon de backtesting resultaten sectie"""
     st.header("🔙 Backtesting Resultaten")
     
     if len(trades) > 0:
-        show_backtest_results(df_backtest, trades)
-        show_trade_history(trades)
+        trades_df = pd.DataFrame(trades)
+        show_backtest_results(df_backtest, trades_df)
+        show_trade_history(trades_df)
         show_export_options(df_backtest, trades)
     else:
         st.warning("Geen trades uitgevoerd in de backtesting periode. Probeer andere parameters.")
 
-def show_backtest_results(df_backtest, trades):
+def show_backtest_results(df_backtest, trades_df):
     """Toon de backtest resultaten en prestatie metrics"""
     st.subheader("📊 Prestatie Metrics")
     
     # Bereken key metrics
-    trades_df = pd.DataFrame(trades)
     initial_capital = st.session_state.initial_capital
     final_value = df_backtest['portfolio_value'].iloc[-1]
     total_return = ((final_value - initial_capital) / initial_capital) * 100
@@ -70,7 +97,23 @@ def show_backtest_results(df_backtest, trades):
         st.metric("Volatiliteit", f"{volatility:.2f}")
         st.metric("Gem. Holding Periode", f"{trades_df['Days Held'].mean():.1f} dagen")
     
-    # Portfolio value grafiek
+    # Portfolio value grafiek (hergebruikt zolang portfolio, trades en benchmark gelijk zijn)
+    key = (
+        data_fingerprint(df_backtest, ('portfolio_value', 'price1')),
+        data_fingerprint(trades_df, ('Entry Date', 'Exit Date', 'Position')),
+        initial_capital,
+        st.session_state.name1
+    )
+    fig = get_figure_cache().get_or_build(
+        'portfolio', key,
+        lambda: build_portfolio_chart(df_backtest, trades_df, buy_hold_value)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_portfolio_chart(df_backtest, trades_df, buy_hold_value):
+    """Bouw de portfolio grafiek met entry/exit markers"""
+    import plotly.graph_objects as go
+    
     fig = go.Figure()
     
     # Portfolio lijn
@@ -91,33 +134,22 @@ def show_backtest_results(df_backtest, trades):
         annotation_position="bottom right"
     )
     
-    # Voeg trade markers toe
-    for trade in trades:
-        # Entry marker
+    # Trade markers: één trace per markertype in plaats van één per trade
+    portfolio = df_backtest['portfolio_value']
+    is_long = (trades_df['Position'] == 'Long Spread').values
+    entry_dates = trades_df['Entry Date']
+    markers = [
+        (entry_dates[is_long], "Entry Long Spread", dict(color='green', size=10, symbol='triangle-up')),
+        (entry_dates[~is_long], "Entry Short Spread", dict(color='red', size=10, symbol='triangle-down')),
+        (trades_df['Exit Date'], "Exit", dict(color='blue', size=8, symbol='x'))
+    ]
+    for dates, name, marker in markers:
         fig.add_trace(go.Scatter(
-            x=[trade['Entry Date']],
-            y=[df_backtest.loc[trade['Entry Date'], 'portfolio_value']],
+            x=dates,
+            y=portfolio.loc[dates].values,
             mode='markers',
-            marker=dict(
-                color='green' if trade['Position'] == 'Long Spread' else 'red',
-                size=10,
-                symbol='triangle-up' if trade['Position'] == 'Long Spread' else 'triangle-down'
-            ),
-            name=f"Entry {trade['Position']}",
-            showlegend=False
-        ))
-        
-        # Exit marker
-        fig.add_trace(go.Scatter(
-            x=[trade['Exit Date']],
-            y=[df_backtest.loc[trade['Exit Date'], 'portfolio_value']],
-            mode='markers',
-            marker=dict(
-                color='blue',
-                size=8,
-                symbol='x'
-            ),
-            name="Exit",
+            marker=marker,
+            name=name,
             showlegend=False
         ))
     
@@ -129,57 +161,107 @@ def show_backtest_results(df_backtest, trades):
         height=500
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def filter_trades(trades_df, positions=None, exit_reasons=None):
+    """Filter trades op positie en exit reden (lege selectie = alles)"""
+    mask = np.ones(len(trades_df), dtype=bool)
+    if positions:
+        mask &= trades_df['Position'].isin(positions).values
+    if exit_reasons:
+        mask &= trades_df['Exit Reason'].isin(exit_reasons).values
+    return trades_df[mask]
 
-def show_trade_history(trades):
-    """Toon de gedetailleerde trade history"""
+def trade_page(trades_df, sort_by, descending, page, page_size):
+    """Sorteer trades en geef alleen de rijen van één pagina terug"""
+    order = trades_df[sort_by].sort_values(ascending=not descending, kind='stable').index
+    start = (page - 1) * page_size
+    return trades_df.loc[order[start:start + page_size], TRADE_COLUMNS]
+
+def show_trade_history(trades_df):
+    """Toon de gedetailleerde trade history (gepagineerd)"""
     st.subheader("📋 Trade Geschiedenis")
     
-    trades_df = pd.DataFrame(trades)
+    # Filters en sortering
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        positions = st.multiselect("Positie", sorted(trades_df['Position'].unique()), key='trades_position')
+    with col2:
+        exit_reasons = st.multiselect("Exit Reden", sorted(trades_df['Exit Reason'].unique()), key='trades_exit_reason')
+    with col3:
+        sort_by = st.selectbox("Sorteer op", TRADE_COLUMNS, key='trades_sort')
+    with col4:
+        descending = st.toggle("Aflopend", value=False, key='trades_descending')
+    
+    filtered = filter_trades(trades_df, positions, exit_reasons)
     
-    # Maak een mooiere weergave voor de tabel
-    display_df = trades_df.copy()
-    display_df['Entry Date'] = display_df['Entry Date'].dt.strftime('%Y-%m-%d')
-    display_df['Exit Date'] = display_df['Exit Date'].dt.strftime('%Y-%m-%d')
-    display_df['P&L'] = display_df['P&L'].apply(lambda x: f"${x:,.0f}")
-    display_df['P&L %'] = display_df['P&L %'].apply(lambda x: f"{x:.2f}%")
-    display_df['Position Size'] = display_df['Position Size'].apply(lambda x: f"${x:,.0f}")
+    # Paginering
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Trades per pagina", PAGE_SIZES, key='trades_page_size')
+    n_pages = max(1, -(-len(filtered) // page_size))
+    if st.session_state.get('trades_page', 1) > n_pages:
+        st.session_state.trades_page = n_pages
+    with col2:
+        page = st.number_input("Pagina", min_value=1, max_value=n_pages, step=1, key='trades_page')
     
-    # Toon de tabel
+    # Alleen de zichtbare pagina naar de browser; opmaak via column config
     st.dataframe(
-        display_df[[
-            'Entry Date', 'Exit Date', 'Position', 
-            'P&L', 'P&L %', 'Position Size',
-            'Exit Reason', 'Days Held'
-        ]],
+        trade_page(filtered, sort_by, descending, page, page_size),
+        column_config={
+            'Entry Date': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+            'Exit Date': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+            'P&L': st.column_config.NumberColumn(format="dollar"),
+            'P&L %': st.column_config.NumberColumn(format="%.2f%%"),
+            'Position Size': st.column_config.NumberColumn(format="dollar")
+        },
+        hide_index=True,
         use_container_width=True,
         height=400
     )
+    st.caption(f"{len(filtered)} van {len(trades_df)} trades · pagina {page} van {n_pages}")
     
-    # Toon distributie grafieken
+    # Toon distributie grafieken (alle trades)
     st.subheader("📊 Trade Analyse")
     col1, col2 = st.columns(2)
+    cache = get_figure_cache()
     
     with col1:
-        fig_pnl = px.histogram(
-            trades_df, 
-            x='P&L %', 
-            nbins=20,
-            title="P&L Distributie (%)",
-            color_discrete_sequence=['#00CC96']
+        fig_pnl = cache.get_or_build(
+            'pnl_histogram',
+            (data_fingerprint(trades_df, ('P&L %',)),),
+            lambda: build_histogram(trades_df['P&L %'], 20, "P&L Distributie (%)", '#00CC96')
         )
         st.plotly_chart(fig_pnl, use_container_width=True)
     
     with col2:
-        fig_days = px.histogram(
-            trades_df, 
-            x='Days Held', 
-            nbins=15,
-            title="Holding Periode (Dagen)",
-            color_discrete_sequence=['#636EFA']
+        fig_days = cache.get_or_build(
+            'days_histogram',
+            (data_fingerprint(trades_df, ('Days Held',)),),
+            lambda: build_histogram(trades_df['Days Held'], 15, "Holding Periode (Dagen)", '#636EFA')
         )
         st.plotly_chart(fig_days, use_container_width=True)
 
+def build_histogram(values, nbins, title, color):
+    """Bouw een histogram uit vooraf berekende bins (alleen bin-tellingen naar de browser)"""
+    import plotly.graph_objects as go
+    
+    counts, edges = np.histogram(values.dropna().values, bins=nbins)
+    
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=values.name,
+        yaxis_title="count",
+        bargap=0
+    )
+    return fig
+
 def show_export_options(df_backtest, trades):
     """Toon opties om backtest data te exporteren"""
     st.markdown("---")
@@ -207,154 +289,3 @@ def show_export_options(df_backtest, trades):
                 file_name=f"trade_history_{st.session_state.name1}_{st.session_state.name2}.csv",
                 mime='text/csv'
             )
-
-def run_backtest(df, entry_threshold, exit_threshold, initial_capital, 
-                transaction_cost, max_position_size, stop_loss_pct, take_profit_pct):
-    """Voer de backtest uit volgens de pairs trading strategie"""
-    # Bereken spread en z-score
-    X = df['price1'].values.reshape(-1, 1)
-    y = df['price2'].values
-    
-    model = LinearRegression()
-    model.fit(X, y)
-    
-    alpha = model.intercept_
-    beta = model.coef_[0]
-    
-    df['spread'] = df['price2'] - (alpha + beta * df['price1'])
-    spread_mean = df['spread'].mean()
-    spread_std = df['spread'].std()
-    df['zscore'] = (df['spread'] - spread_mean) / spread_std
-    
-    # Initialiseer backtesting variabelen
-    cash = initial_capital
-    position = 0  # 0 = geen positie, 1 = long spread, -1 = short spread
-    coin1_shares = 0
-    coin2_shares = 0
-    entry_price1 = 0
-    entry_price2 = 0
-    entry_date = None
-    position_value = 0
-    
-    # Tracking variabelen
-    trades = []
-    portfolio_values = []
-    positions = []
-    
-    # Bereken maximum positie grootte
-    max_position_value = (max_position_size / 100) * initial_capital
-    
-    for i in range(len(df)):
-        current_zscore = df['zscore'].iloc[i]
-        current_price1 = df['price1'].iloc[i]
-        current_price2 = df['price2'].iloc[i]
-        current_date = df.index[i]
-        
-        # Bereken huidige portfolio waarde
-        position_market_value = coin1_shares * current_price1 + coin2_shares * current_price2
-        portfolio_value = cash + position_market_value
-        
-        # Check voor nieuwe posities
-        if position == 0 and i > 0:
-            if current_zscore < -entry_threshold:  # Long spread signaal
-                position = 1
-                position_value = min(max_position_value, portfolio_value * 0.95)
-                
-                half_position = position_value / 2
-                coin2_shares = half_position / current_price2  # Long coin2
-                coin1_shares = -half_position / current_price1  # Short coin1
-                
-                entry_price1 = current_price1
-                entry_price2 = current_price2
-                entry_date = current_date
-                
-                # Transactiekosten
-                transaction_costs = position_value * (transaction_cost / 100)
-                cash -= transaction_costs
-                
-            elif current_zscore > entry_threshold:  # Short spread signaal
-                position = -1
-                position_value = min(max_position_value, portfolio_value * 0.95)
-                
-                half_position = position_value / 2
-                coin1_shares = half_position / current_price1  # Long coin1
-                coin2_shares = -half_position / current_price2  # Short coin2
-                
-                entry_price1 = current_price1
-                entry_price2 = current_price2
-                entry_date = current_date
-                
-                # Transactiekosten
-                transaction_costs = position_value * (transaction_cost / 100)
-                cash -= transaction_costs
-        
-        # Check voor exit condities
-        elif position != 0:
-            exit_trade = False
-            exit_reason = ""
-            
-            # Normal exit op z-score
-            if abs(current_zscore) < exit_threshold:
-                exit_trade = True
-                exit_reason = "Z-score exit"
-            
-            # P&L berekening voor risk management
-            current_position_value = abs(coin1_shares * current_price1) + abs(coin2_shares * current_price2)
-            pnl_dollar = (coin1_shares * (current_price1 - entry_price1) + 
-                         coin2_shares * (current_price2 - entry_price2))
-            pnl_pct = (pnl_dollar / position_value) * 100
-            
-            # Stop loss en take profit checks
-            if pnl_pct < -stop_loss_pct:
-                exit_trade = True
-                exit_reason = "Stop loss"
-            elif pnl_pct > take_profit_pct:
-                exit_trade = True
-                exit_reason = "Take profit"
-            
-            # Execute exit
-            if exit_trade:
-                final_pnl = pnl_dollar
-                exit_transaction_costs = current_position_value * (transaction_cost / 100)
-                final_pnl -= exit_transaction_costs
-                cash += (coin1_shares * current_price1 + coin2_shares * current_price2 + final_pnl)
-                
-                # Log trade
-                trades.append({
-                    'Entry Date': entry_date,
-                    'Exit Date': current_date,
-                    'Position': 'Long Spread' if position == 1 else 'Short Spread',
-                    'Entry Z-score': df['zscore'].loc[entry_date],
-                    'Exit Z-score': current_zscore,
-                    'Entry Price 1': entry_price1,
-                    'Entry Price 2': entry_price2,
-                    'Exit Price 1': current_price1,
-                    'Exit Price 2': current_price2,
-                    'Coin1 Shares': coin1_shares,
-                    'Coin2 Shares': coin2_shares,
-                    'Position Size': position_value,
-                    'P&L': final_pnl,
-                    'P&L %': (final_pnl / position_value) * 100,
-                    'Exit Reason': exit_reason,
-                    'Days Held': (current_date - entry_date).days
-                })
-                
-                # Reset position
-                position = 0
-                coin1_shares = 0
-                coin2_shares = 0
-                entry_price1 = 0
-                entry_price2 = 0
-                entry_date = None
-                position_value = 0
-        
-        # Track portfolio value en posities
-        portfolio_values.append(portfolio_value)
-        positions.append(position)
-    
-    # Creëer results DataFrame
-    df_result = df.copy()
-    df_result['portfolio_value'] = portfolio_values
-    df_result['position'] = positions
-    
-    return df_result, trades
\ No newline at end of file
@@ -0,0 +1,77 @@
+import itertools
+from functools import lru_cache
+import streamlit as st
+import numpy as np
+from pages.backtesting import backtest_params
+from utils.job_queue import list_jobs, job_results, resume_job, submit_scan, submit_sweep, param_grid
+from utils.pair_index import load_pair_index
+
+# Alleen de status van de nieuwste jobs wordt elke 2 s ververst
+MAX_JOBS_SHOWN = 10
+
+def show(df, params, tickers_dict):
+    """Toon het jobs paneel: sweeps/scans starten en voortgang volgen"""
+    st.markdown("---")
+    st.header("🧵 Achtergrond Jobs")
+
+    base_params = backtest_params(params)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button("Start parameter sweep (huidig pair)", key='jobs_sweep'):
+            grid = param_grid(
+                base_params,
+                entry_threshold=np.round(np.arange(1.0, 3.01, 0.25), 2).tolist(),
+                exit_threshold=np.round(np.arange(0.0, 1.01, 0.25), 2).tolist(),
+                stop_loss_pct=[2.5, 5.0, 10.0],
+                take_profit_pct=[5.0, 10.0, 20.0]
+            )
+            job_id = submit_sweep(df, grid, label=f"Sweep {params['name1']} / {params['name2']}")
+            st.success(f"Sweep gestart: {job_id} ({len(grid)} combinaties)")
+
+    with col2:
+        # Met een opgeslagen pair index (python -m utils.pair_index update) alleen kandidaat pairs
+        index = load_pair_index()
+        prune = index is not None and st.checkbox(
+            "Alleen pairs binnen correlatie clusters",
+            value=True,
+            key='jobs_prune'
+        )
+        if st.button("Start universe scan", key='jobs_scan'):
+            if prune:
+                pairs = index.candidate_pairs(tickers_dict.values())
+            else:
+                pairs = list(itertools.combinations(tickers_dict.values(), 2))
+            job_id = submit_scan(pairs, params['period'], params['interval'], base_params)
+            st.success(f"Scan gestart: {job_id} ({len(pairs)} pairs)")
+
+    show_job_progress()
+
+@lru_cache(maxsize=32)
+def _job_results(job_id, done):
+    """Resultaten per (job, aantal voltooide chunks): alleen nieuwe checkpoints herladen"""
+    return job_results(job_id)
+
+@st.fragment(run_every="2s")
+def show_job_progress():
+    """Voortgang van alle jobs (ververst zichzelf zonder volledige rerun)"""
+    jobs = list_jobs(limit=MAX_JOBS_SHOWN)
+    if not jobs:
+        st.info("Nog geen jobs gestart.")
+        return
+
+    for job in jobs:
+        st.write(f"**{job['label']}** · {job['created_at']} · {job['state']}")
+        st.progress(job['progress'], text=f"{job['done']}/{job['n_chunks']} chunks")
+
+        if job['state'] in ('onderbroken', 'mislukt'):
+            if st.button("Hervat", key=f"resume_{job['id']}"):
+                resume_job(job['id'])
+
+        # Chunks pas inlezen als de gebruiker de resultaten opvraagt
+        if job['done'] > 0 and st.toggle("Toon resultaten", key=f"results_{job['id']}"):
+            results = _job_results(job['id'], job['done'])
+            if 'total_return' in results.columns:
+                results = results.sort_values('total_return', ascending=False)
+            st.dataframe(results, use_container_width=True, height=300)
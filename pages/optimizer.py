@@ -0,0 +1,53 @@
+import streamlit as st
+from pages.backtesting import backtest_params
+from utils.optimizer import hyperband, best_params, SEARCH_SPACE
+
+METRICS = {
+    "Sharpe Ratio": 'sharpe_ratio',
+    "Totaal Rendement": 'total_return',
+    "Max Drawdown (laag)": 'max_drawdown'
+}
+
+def show(df, params):
+    """Toon de adaptieve parameter optimalisatie (Hyperband)"""
+    with st.expander("🎛️ Parameter Optimalisatie"):
+        col1, col2 = st.columns(2)
+        with col1:
+            metric_label = st.selectbox("Optimaliseer op", list(METRICS.keys()), key='opt_metric')
+        with col2:
+            max_candidates = st.select_slider(
+                "Max kandidaten per bracket",
+                options=[27, 81, 243],
+                value=81,
+                key='opt_max_candidates'
+            )
+
+        if not st.button("Start optimalisatie", key='opt_run'):
+            return
+
+        base_params = backtest_params(params)
+
+        progress_bar = st.progress(0.0, text="Brackets evalueren...")
+        history = hyperband(
+            df[['price1', 'price2']],
+            base_params,
+            max_candidates=max_candidates,
+            metric=METRICS[metric_label],
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"Bracket {done}/{total}")
+        )
+
+        best = best_params(history, base_params)
+        full_runs = history['bars'].sum() / len(df)
+        st.success(
+            f"{len(history)} evaluaties, kosten gelijk aan {full_runs:.1f} volledige backtests"
+        )
+
+        st.subheader("Beste parameters")
+        st.json({name: best[name] for name in SEARCH_SPACE})
+
+        final = history[history['fraction'] >= 1.0].sort_values('score', ascending=False)
+        st.dataframe(
+            final[list(SEARCH_SPACE) + ['score', 'total_return', 'n_trades', 'max_drawdown']],
+            use_container_width=True,
+            height=300
+        )
@@ -1,5 +1,6 @@
 import streamlit as st
 from constants.tickers import tickers
+from constants.sliders import SLIDER_BOUNDS
 
 def show(tickers_dict):
     """
@@ -46,10 +47,7 @@ def show(tickers_dict):
         )
         params['corr_window'] = st.slider(
             "Rolling correlatie window (dagen)", 
-            min_value=5, 
-            max_value=60, 
-            value=20,
-            step=1,
+            **SLIDER_BOUNDS['corr_window'],
             key='sb_corr_window'
         )
 
@@ -58,18 +56,12 @@ def show(tickers_dict):
         st.header("⚙️ Trading Parameters")
         params['zscore_entry'] = st.slider(
             "Z-score entry threshold", 
-            min_value=1.0, 
-            max_value=5.0, 
-            value=2.0, 
-            step=0.1,
+            **SLIDER_BOUNDS['zscore_entry'],
             key='sb_zscore_entry'
         )
         params['zscore_exit'] = st.slider(
             "Z-score exit threshold", 
-            min_value=0.0, 
-            max_value=2.0, 
-            value=0.5, 
-            step=0.1,
+            **SLIDER_BOUNDS['zscore_exit'],
             key='sb_zscore_exit'
         )
 
@@ -86,18 +78,12 @@ def show(tickers_dict):
         )
         params['transaction_cost'] = st.slider(
             "Transactiekosten (%)", 
-            min_value=0.0, 
-            max_value=1.0, 
-            value=0.1, 
-            step=0.01,
+            **SLIDER_BOUNDS['transaction_cost'],
             key='sb_transaction_cost'
         )
         params['max_position'] = st.slider(
             "Max positie grootte (% van kapitaal)", 
-            min_value=10, 
-            max_value=100, 
-            value=50, 
-            step=10,
+            **SLIDER_BOUNDS['max_position'],
             key='sb_max_position'
         )
 
@@ -106,20 +92,24 @@ def show(tickers_dict):
         st.subheader("🛡️ Risk Management")
         params['stop_loss'] = st.slider(
             "Stop Loss (%)", 
-            min_value=0.0, 
-            max_value=20.0, 
-            value=5.0, 
-            step=0.5,
+            **SLIDER_BOUNDS['stop_loss'],
             key='sb_stop_loss'
         )
         params['take_profit'] = st.slider(
             "Take Profit (%)", 
-            min_value=0.0, 
-            max_value=50.0, 
-            value=10.0, 
-            step=1.0,
+            **SLIDER_BOUNDS['take_profit'],
             key='sb_take_profit'
         )
+        params['run_backtest'] = st.checkbox(
+            "Backtest uitvoeren",
+            value=False,
+            key='sb_run_backtest'
+        )
+        params['show_jobs'] = st.checkbox(
+            "Toon achtergrond jobs",
+            value=False,
+            key='sb_show_jobs'
+        )
 
         # Info sectie
         st.markdown("---")
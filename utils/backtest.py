@@ -0,0 +1,226 @@
+"""
+Backtest kern: simulatie, spread kolommen en samenvattende metrics
+
+Bewust vrij van streamlit en plotly, zodat worker processen (job queue,
+optimizer) alleen numpy en pandas laden. pages/backtesting.py
+her-exporteert deze functies voor de UI.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.regression import fit_ols
+from utils.backtest_cache import BacktestCache, data_fingerprint, get_backtest_cache
+
+def backtest_metrics(df_backtest, trades, initial_capital):
+    """Samenvattende metrics van een backtest (zelfde formules als de resultaten sectie)"""
+    portfolio = df_backtest['portfolio_value']
+    final_value = portfolio.iloc[-1]
+    total_return = ((final_value - initial_capital) / initial_capital) * 100
+    
+    returns = portfolio.pct_change().dropna()
+    volatility = returns.std() * np.sqrt(252)
+    sharpe_ratio = (total_return / 100) / volatility if volatility > 0 else 0
+    max_drawdown = ((portfolio.cummax() - portfolio) / portfolio.cummax()).max() * 100
+    
+    pnl = np.array([trade['P&L'] for trade in trades], dtype=float)
+    win_rate = (pnl > 0).mean() * 100 if len(pnl) > 0 else 0
+    
+    return {
+        'total_return': float(total_return),
+        'final_value': float(final_value),
+        'n_trades': len(trades),
+        'win_rate': float(win_rate),
+        'sharpe_ratio': float(sharpe_ratio),
+        'max_drawdown': float(max_drawdown)
+    }
+
+def add_spread_columns(df):
+    """Bereken spread en z-score op basis van een OLS fit (in-place)"""
+    model = fit_ols(df['price1'].values, df['price2'].values)
+    
+    alpha = model['alpha']
+    beta = model['beta']
+    
+    df['spread'] = df['price2'] - (alpha + beta * df['price1'])
+    spread_mean = df['spread'].mean()
+    spread_std = df['spread'].std()
+    df['zscore'] = (df['spread'] - spread_mean) / spread_std
+    
+    return df
+
+def cached_run_backtest(df, entry_threshold, exit_threshold, initial_capital, 
+                        transaction_cost, max_position_size, stop_loss_pct, take_profit_pct,
+                        cache=None, record=None):
+    """
+    run_backtest met memoization op data fingerprint en parameters
+    
+    Een eerder gedraaide combinatie wordt direct uit de cache opgebouwd
+    in plaats van de volledige simulatie opnieuw te doen.
+    
+    `record(df_result, trades)` wordt per cache entry aangeroepen tot het
+    True teruggeeft; een mislukte schrijfactie wordt bij de volgende
+    aanroep dus opnieuw geprobeerd. De markering staat alleen in het
+    geheugen, zodat een entry van schijf na een herstart opnieuw wordt
+    aangeboden.
+    """
+    if cache is None:
+        cache = get_backtest_cache()
+    params = (entry_threshold, exit_threshold, initial_capital, transaction_cost,
+              max_position_size, stop_loss_pct, take_profit_pct)
+    key = BacktestCache.make_key(data_fingerprint(df), params)
+    
+    entry = cache.get(key)
+    if entry is None:
+        df_result, trades = run_backtest(df, *params)
+        entry = cache.put(key, df_result['portfolio_value'].values, df_result['position'].values, trades)
+    else:
+        # Reconstrueer het resultaat uit de compacte opslag
+        add_spread_columns(df)
+        df_result = df.copy()
+        df_result['portfolio_value'] = entry['portfolio_value']
+        df_result['position'] = entry['position'].astype(int)
+        trades = pd.DataFrame(entry['trades']).to_dict('records')
+    
+    if record is not None and not entry.get('recorded') and record(df_result, trades):
+        entry['recorded'] = True
+    
+    return df_result, trades
+
+def run_backtest(df, entry_threshold, exit_threshold, initial_capital, 
+                transaction_cost, max_position_size, stop_loss_pct, take_profit_pct):
+    """Voer de backtest uit volgens de pairs trading strategie"""
+    # Bereken spread en z-score
+    add_spread_columns(df)
+    
+    # Initialiseer backtesting variabelen
+    cash = initial_capital
+    position = 0  # 0 = geen positie, 1 = long spread, -1 = short spread
+    coin1_shares = 0
+    coin2_shares = 0
+    entry_price1 = 0
+    entry_price2 = 0
+    entry_date = None
+    position_value = 0
+    
+    # Tracking variabelen
+    trades = []
+    portfolio_values = []
+    positions = []
+    
+    # Bereken maximum positie grootte
+    max_position_value = (max_position_size / 100) * initial_capital
+    
+    for i in range(len(df)):
+        current_zscore = df['zscore'].iloc[i]
+        current_price1 = df['price1'].iloc[i]
+        current_price2 = df['price2'].iloc[i]
+        current_date = df.index[i]
+        
+        # Bereken huidige portfolio waarde
+        position_market_value = coin1_shares * current_price1 + coin2_shares * current_price2
+        portfolio_value = cash + position_market_value
+        
+        # Check voor nieuwe posities
+        if position == 0 and i > 0:
+            if current_zscore < -entry_threshold:  # Long spread signaal
+                position = 1
+                position_value = min(max_position_value, portfolio_value * 0.95)
+                
+                half_position = position_value / 2
+                coin2_shares = half_position / current_price2  # Long coin2
+                coin1_shares = -half_position / current_price1  # Short coin1
+                
+                entry_price1 = current_price1
+                entry_price2 = current_price2
+                entry_date = current_date
+                
+                # Transactiekosten
+                transaction_costs = position_value * (transaction_cost / 100)
+                cash -= transaction_costs
+                
+            elif current_zscore > entry_threshold:  # Short spread signaal
+                position = -1
+                position_value = min(max_position_value, portfolio_value * 0.95)
+                
+                half_position = position_value / 2
+                coin1_shares = half_position / current_price1  # Long coin1
+                coin2_shares = -half_position / current_price2  # Short coin2
+                
+                entry_price1 = current_price1
+                entry_price2 = current_price2
+                entry_date = current_date
+                
+                # Transactiekosten
+                transaction_costs = position_value * (transaction_cost / 100)
+                cash -= transaction_costs
+        
+        # Check voor exit condities
+        elif position != 0:
+            exit_trade = False
+            exit_reason = ""
+            
+            # Normal exit op z-score
+            if abs(current_zscore) < exit_threshold:
+                exit_trade = True
+                exit_reason = "Z-score exit"
+            
+            # P&L berekening voor risk management
+            current_position_value = abs(coin1_shares * current_price1) + abs(coin2_shares * current_price2)
+            pnl_dollar = (coin1_shares * (current_price1 - entry_price1) + 
+                         coin2_shares * (current_price2 - entry_price2))
+            pnl_pct = (pnl_dollar / position_value) * 100
+            
+            # Stop loss en take profit checks
+            if pnl_pct < -stop_loss_pct:
+                exit_trade = True
+                exit_reason = "Stop loss"
+            elif pnl_pct > take_profit_pct:
+                exit_trade = True
+                exit_reason = "Take profit"
+            
+            # Execute exit
+            if exit_trade:
+                final_pnl = pnl_dollar
+                exit_transaction_costs = current_position_value * (transaction_cost / 100)
+                final_pnl -= exit_transaction_costs
+                cash += (coin1_shares * current_price1 + coin2_shares * current_price2 + final_pnl)
+                
+                # Log trade
+                trades.append({
+                    'Entry Date': entry_date,
+                    'Exit Date': current_date,
+                    'Position': 'Long Spread' if position == 1 else 'Short Spread',
+                    'Entry Z-score': df['zscore'].loc[entry_date],
+                    'Exit Z-score': current_zscore,
+                    'Entry Price 1': entry_price1,
+                    'Entry Price 2': entry_price2,
+                    'Exit Price 1': current_price1,
+                    'Exit Price 2': current_price2,
+                    'Coin1 Shares': coin1_shares,
+                    'Coin2 Shares': coin2_shares,
+                    'Position Size': position_value,
+                    'P&L': final_pnl,
+                    'P&L %': (final_pnl / position_value) * 100,
+                    'Exit Reason': exit_reason,
+                    'Days Held': (current_date - entry_date).days
+                })
+                
+                # Reset position
+                position = 0
+                coin1_shares = 0
+                coin2_shares = 0
+                entry_price1 = 0
+                entry_price2 = 0
+                entry_date = None
+                position_value = 0
+        
+        # Track portfolio value en posities
+        portfolio_values.append(portfolio_value)
+        positions.append(position)
+    
+    # Creëer results DataFrame
+    df_result = df.copy()
+    df_result['portfolio_value'] = portfolio_values
+    df_result['position'] = positions
+    
+    return df_result, trades
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def data_fingerprint(df, columns=('price1', 'price2')):
+    """
+    Content-hash van de prijsdata (inclusief index)
+
+    Args:
+        df (pd.DataFrame): DataFrame met prijskolommen
+        columns (tuple): Kolommen die de backtest-invoer bepalen
+
+    Returns:
+        str: Hex digest van de data
+    """
+    hashed = pd.util.hash_pandas_object(df[list(columns)], index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+def _entry_size(entry):
+    """Geheugengebruik (bytes) van een opgeslagen resultaat"""
+    size = entry['portfolio_value'].nbytes + entry['position'].nbytes
+    size += sum(np.asarray(col).nbytes for col in entry['trades'].values())
+    return size
+
+class BacktestCache:
+    """
+    LRU cache voor backtest resultaten met geheugenlimiet
+
+    Resultaten worden compact opgeslagen: de equity curve en posities als
+    NumPy arrays en de trades als kolommen. Optioneel worden ze ook naar
+    schijf geschreven zodat ze een herstart overleven.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint, params):
+        """Sleutel van data fingerprint en volledige parameter tuple"""
+        return (fingerprint, tuple(float(p) for p in params))
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def get(self, key):
+        """Haal een opgeslagen resultaat op (of None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        self._store(key, entry)
+        return entry
+
+    def put(self, key, portfolio_values, positions, trades):
+        """Sla een backtest resultaat compact op"""
+        trades_df = pd.DataFrame(trades)
+        entry = {
+            'portfolio_value': np.asarray(portfolio_values, dtype=np.float64),
+            'position': np.asarray(positions, dtype=np.int8),
+            'trades': {col: trades_df[col].to_numpy() for col in trades_df.columns}
+        }
+        self._store(key, entry)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+
+        return entry
+
+    def _store(self, key, entry):
+        size = _entry_size(entry)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self._total_bytes += size
+
+            # LRU eviction tot we weer onder de limiet zitten
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Aantal resultaten en geheugengebruik"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_backtest_cache():
+    """
+    Proces-brede cache (overleeft Streamlit reruns)
+
+    Schijfopslag staat aan als PAIRY_BACKTEST_CACHE_DIR gezet is,
+    de geheugenlimiet is in te stellen via PAIRY_BACKTEST_CACHE_MB.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            max_mb = float(os.environ.get('PAIRY_BACKTEST_CACHE_MB', DEFAULT_MAX_BYTES / 1024 / 1024))
+            _default_cache = BacktestCache(
+                max_bytes=int(max_mb * 1024 * 1024),
+                cache_dir=os.environ.get('PAIRY_BACKTEST_CACHE_DIR') or None
+            )
+        return _default_cache
@@ -1,41 +1,86 @@
-import yfinance as yf
+import importlib
+import os
+
 import pandas as pd
-import streamlit as st
-from sklearn.linear_model import LinearRegression
+from utils.regression import fit_ols
+from utils.resample import get_timeframe_store
 
-@st.cache_data(ttl=3600)
-def load_data(ticker, period, interval):
-    """Laad data van Yahoo Finance met caching"""
-    try:
-        data = yf.download(ticker, period=period, interval=interval)
-        return data[['Close']].rename(columns={'Close': 'price'})
-    except Exception as e:
-        st.error(f"Fout bij laden {ticker}: {str(e)}")
-        return pd.DataFrame()
+# Beschikbare databronnen: naam -> callable of "module:functie" (lazy geladen)
+DATA_SOURCES = {
+    'yahoo': 'utils.data_loader:fetch_yahoo',
+    'synthetic': 'utils.synthetic_data:fetch_synthetic'
+}
+
+def register_source(name, fetch):
+    """
+    Registreer een databron
+    
+    Args:
+        name (str): Naam van de bron (te kiezen via PAIRY_DATA_SOURCE)
+        fetch: Callable (ticker, period, interval) -> DataFrame met kolom 'price',
+            of een "module:functie" string die pas bij gebruik geladen wordt
+    """
+    DATA_SOURCES[name] = fetch
+
+def get_source(name=None):
+    """Zoek de fetch functie van een databron op (standaard PAIRY_DATA_SOURCE)"""
+    name = name or os.environ.get('PAIRY_DATA_SOURCE', 'yahoo')
+    if name not in DATA_SOURCES:
+        raise ValueError(f"Onbekende databron '{name}', kies uit: {', '.join(DATA_SOURCES)}")
+    
+    fetch = DATA_SOURCES[name]
+    if isinstance(fetch, str):
+        module_name, _, func_name = fetch.partition(':')
+        fetch = getattr(importlib.import_module(module_name), func_name)
+        DATA_SOURCES[name] = fetch
+    return fetch
+
+def fetch_yahoo(ticker, period, interval):
+    """Download data van Yahoo Finance"""
+    # yfinance pas laden wanneer er echt gedownload wordt
+    import yfinance as yf
+    data = yf.download(ticker, period=period, interval=interval, progress=False)
+    
+    # Nieuwere yfinance versies geven een kolom-niveau per ticker terug
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.xs(ticker, axis=1, level=-1)
+    
+    # Alleen de slotkoers: de gedeelde frames en resampling gebruiken enkel 'price'
+    return data[['Close']].rename(columns={'Close': 'price'})
+
+def fetch_data(ticker, period, interval, source=None):
+    """
+    Laad data van de ingestelde databron (gooit bij fouten)
+    
+    Alleen het fijnste interval wordt opgehaald; grovere intervallen
+    worden lokaal geresampled en per (ticker, periode, interval) bewaard.
+    """
+    name = source or os.environ.get('PAIRY_DATA_SOURCE', 'yahoo')
+    return get_timeframe_store().get(name, get_source(name), ticker, period, interval)
 
 def preprocess_data(data1, data2):
     """Combineer data en bereken statistieken"""
     try:
         # Combineer data
         df = pd.concat([
-            data1['Close'].rename('price1'),
-            data2['Close'].rename('price2')
+            data1['price'].rename('price1'),
+            data2['price'].rename('price2')
         ], axis=1).dropna()
         
         if df.empty:
+            import streamlit as st
             st.error("Geen overlappende data tussen de assets")
             return pd.DataFrame()
         
         # Bereken spread en z-scores
-        X = df['price1'].values.reshape(-1, 1)
-        y = df['price2'].values
-        
-        model = LinearRegression().fit(X, y)
-        df['spread'] = df['price2'] - (model.intercept_ + model.coef_[0] * df['price1'])
+        model = fit_ols(df['price1'].values, df['price2'].values)
+        df['spread'] = df['price2'] - (model['alpha'] + model['beta'] * df['price1'])
         df['zscore'] = (df['spread'] - df['spread'].mean()) / df['spread'].std()
         
         return df
         
     except Exception as e:
+        # streamlit pas laden voor de foutmelding: workers importeren deze module ook
+        import streamlit as st
         st.error(f"Data verwerkingsfout: {str(e)}")
         return pd.DataFrame()
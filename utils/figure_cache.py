@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Trace attributen die de grootte van een figuur bepalen
+DATA_ATTRIBUTES = ('x', 'y', 'text', 'customdata')
+
+def _figure_size(fig):
+    """Geschatte grootte (bytes) van de data arrays in een figuur"""
+    size = 0
+    for trace in fig.data:
+        for attr in DATA_ATTRIBUTES:
+            values = getattr(trace, attr, None)
+            if values is not None and not isinstance(values, str):
+                size += np.asarray(values).nbytes
+    return size
+
+class FigureCache:
+    """
+    LRU cache voor gebouwde Plotly figuren
+
+    De sleutel bestaat uit de naam van de figuur, de fingerprint van de
+    data en alleen de parameters waar die figuur van afhangt. Een rerun
+    die niets aan de grafiek verandert (export knoppen, backtest
+    instellingen, ...) krijgt hetzelfde figuur-object terug zonder het
+    opnieuw op te bouwen. Voor de geheugenlimiet wordt de grootte geschat
+    uit de data arrays van de traces, zonder de figuur te serialiseren.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, name, key, build):
+        """
+        Haal een figuur uit de cache of bouw hem
+
+        Args:
+            name (str): Naam van de figuur (bv. 'spread')
+            key (tuple): Data fingerprint en relevante parameters
+            build (callable): Bouwt de figuur bij een cache miss
+
+        Returns:
+            plotly.graph_objects.Figure
+        """
+        full_key = (name,) + tuple(key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        fig = build()
+        size = _figure_size(fig)
+
+        with self._lock:
+            if full_key in self._entries:
+                self._total_bytes -= self._entries.pop(full_key)[1]
+            self._entries[full_key] = (fig, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+_default_cache = FigureCache()
+
+def get_figure_cache():
+    """Proces-brede figuur cache (gedeeld door alle sessies)"""
+    return _default_cache
@@ -0,0 +1,137 @@
+"""
+Import-tijd rapport per module
+
+Gebruik:
+    python -m utils.import_report [module ...]
+    python -m utils.import_report --workers
+
+Met --workers wordt per worker module gecontroleerd dat streamlit en
+plotly niet mee geladen worden; de exit code is 1 als dat wel zo is.
+
+Elke module wordt in een vers Python proces geïmporteerd met
+`-X importtime`, zodat de gemeten tijd de echte cold-start kost is
+(inclusief alle afhankelijkheden die nog niet geladen waren).
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    'numpy',
+    'pandas',
+    'streamlit',
+    'plotly.graph_objects',
+    'plotly.express',
+    'yfinance',
+    'utils.regression',
+    'utils.data_loader',
+    'utils.spread_calculator',
+    'pages.sidebar',
+    'pages.analysis',
+    'pages.backtesting',
+    'utils.backtest',
+    'utils.optimizer',
+    'utils.job_queue',
+    'main',
+]
+
+# Modules die in job/optimizer worker processen geladen worden
+WORKER_MODULES = [
+    'utils.backtest',
+    'utils.data_loader',
+    'utils.spread_calculator',
+    'utils.optimizer',
+    'utils.job_queue',
+]
+
+# Packages die alleen de UI nodig heeft
+UI_PACKAGES = ('streamlit', 'plotly')
+
+def measure_import(module):
+    """
+    Meet de cumulatieve import-tijd van een module in microseconden
+
+    Returns:
+        int of None: Cumulatieve tijd, None als de import mislukt
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None
+
+    # Regels: "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or parts[2].strip() != module:
+            continue
+        try:
+            return int(parts[1])
+        except ValueError:
+            continue
+    return None
+
+def ui_imports(module):
+    """
+    UI packages die mee geladen worden bij het importeren van een module
+
+    Returns:
+        list of None: Geladen UI packages, None als de import mislukt
+    """
+    code = (
+        f'import sys, {module}; '
+        f'print(" ".join(p for p in {UI_PACKAGES!r} if p in sys.modules))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.split()
+
+def check_workers(modules=None):
+    """Print per worker module de geladen UI packages; True als alles schoon is"""
+    modules = modules or WORKER_MODULES
+    width = max(len(m) for m in modules)
+    clean = True
+    for module in modules:
+        loaded = ui_imports(module)
+        if loaded is None:
+            status = 'import mislukt'
+        else:
+            status = ', '.join(loaded) or 'ok'
+        clean = clean and loaded == []
+        print(f"{module:<{width}}  {status}")
+    return clean
+
+def report(modules=None):
+    """Meet alle modules en retourneer (module, microseconden) gesorteerd op kost"""
+    results = [(module, measure_import(module)) for module in (modules or MODULES)]
+    return sorted(results, key=lambda r: -1 if r[1] is None else r[1], reverse=True)
+
+def main(argv=None):
+    args = argv if argv is not None else sys.argv[1:]
+    if '--workers' in args:
+        sys.exit(0 if check_workers() else 1)
+
+    modules = args or MODULES
+    width = max(len(m) for m in modules)
+
+    print(f"{'Module':<{width}}  {'Import (ms)':>12}")
+    print('-' * (width + 14))
+    for module, cost in report(modules):
+        cost_str = 'niet beschikbaar' if cost is None else f"{cost / 1000:.1f}"
+        print(f"{module:<{width}}  {cost_str:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Lokale job queue voor lange parameter sweeps en universe scans
+
+Gebruik:
+    python -m utils.job_queue run <job_dir> [--workers N]
+    python -m utils.job_queue status
+
+Een job wordt opgesplitst in chunks. Een losgekoppeld runner-proces
+verdeelt de chunks over een pool van worker processen en schrijft elke
+voltooide chunk als checkpoint naar schijf. Bij een onderbreking (of
+een herstart van de server) pakt resume_job alleen de ontbrekende
+chunks op. De Streamlit sessie leest enkel de voortgang uit de
+job map en kan dus gerust herladen of wegvallen.
+"""
+import argparse
+import itertools
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+# Alleen streamlit-vrije modules: elke worker laadt deze bij het opstarten
+from utils.backtest import run_backtest, backtest_metrics
+from utils.data_loader import fetch_data
+from utils.spread_calculator import calculate_spread
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_JOBS_DIR = os.path.join(os.path.expanduser('~'), '.pairy', 'jobs')
+
+SWEEP_CHUNK_SIZE = 8
+SCAN_CHUNK_SIZE = 4
+
+# Vaste job gegevens in meta.json; de status leest niet het hele spec.json
+META_FIELDS = ('id', 'kind', 'label', 'created_at', 'n_chunks')
+
+def jobs_dir():
+    path = os.environ.get('PAIRY_JOBS_DIR', DEFAULT_JOBS_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _job_path(job_id):
+    return os.path.join(jobs_dir(), job_id)
+
+def _write_atomic(path, data, mode='wb'):
+    """Schrijf eerst naar een tijdelijk bestand, zodat een checkpoint nooit half is"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def param_grid(base_params, **ranges):
+    """
+    Alle combinaties van parameterwaarden
+
+    Args:
+        base_params (dict): Vaste run_backtest parameters
+        **ranges: Parameter naam -> lijst van waarden
+
+    Returns:
+        list: Parameter dicts voor run_backtest
+    """
+    names = list(ranges)
+    return [
+        {**base_params, **dict(zip(names, values))}
+        for values in itertools.product(*(ranges[name] for name in names))
+    ]
+
+# Worker functies (top-level, zodat ze naar worker processen gepickled kunnen worden)
+
+def _run_sweep_chunk(job_dir, params_list):
+    """Backtest één prijsreeks met een lijst parameter sets"""
+    with open(os.path.join(job_dir, 'data.pkl'), 'rb') as f:
+        df = pickle.load(f)
+
+    rows = []
+    for params in params_list:
+        df_result, trades = run_backtest(df.copy(), **params)
+        rows.append({**params, **backtest_metrics(df_result, trades, params['initial_capital'])})
+    return rows
+
+def _run_scan_chunk(job_dir, pairs, period, interval, params, source):
+    """Fit de spread en backtest een lijst ticker pairs"""
+    rows = []
+    for coin1, coin2 in pairs:
+        row = {'coin1': coin1, 'coin2': coin2}
+        try:
+            df = pd.concat([
+                fetch_data(coin1, period, interval, source=source)['price'].rename('price1'),
+                fetch_data(coin2, period, interval, source=source)['price'].rename('price2')
+            ], axis=1).dropna()
+            df, model = calculate_spread(df)
+            df_result, trades = run_backtest(df, **params)
+            row.update(model)
+            row.update(backtest_metrics(df_result, trades, params['initial_capital']))
+        except Exception as e:
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+def _read_spec(job_dir):
+    with open(os.path.join(job_dir, 'spec.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+@lru_cache(maxsize=256)
+def _read_meta(job_dir):
+    """Vaste job gegevens (verandert nooit, dus per job_dir gecached)"""
+    try:
+        with open(os.path.join(job_dir, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Jobs van voor meta.json: eenmalig uit het spec halen
+        spec = _read_spec(job_dir)
+        return {field: spec.get(field, spec['kind']) for field in META_FIELDS}
+
+def _chunk_path(job_dir, index):
+    return os.path.join(job_dir, 'chunks', f"{index:06d}.pkl")
+
+def _pending_chunks(job_dir, spec):
+    return [i for i in range(spec['n_chunks']) if not os.path.exists(_chunk_path(job_dir, i))]
+
+def run_job(job_dir, workers=None):
+    """
+    Verwerk alle nog ontbrekende chunks van een job (blokkerend)
+
+    Wordt door het runner-proces aangeroepen; elke voltooide chunk wordt
+    direct als checkpoint weggeschreven.
+    """
+    spec = _read_spec(job_dir)
+    os.makedirs(os.path.join(job_dir, 'chunks'), exist_ok=True)
+    _write_atomic(os.path.join(job_dir, 'runner.pid'), str(os.getpid()), mode='w')
+
+    pending = _pending_chunks(job_dir, spec)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {}
+        for index in pending:
+            if spec['kind'] == 'sweep':
+                future = pool.submit(_run_sweep_chunk, job_dir, spec['chunks'][index])
+            else:
+                future = pool.submit(
+                    _run_scan_chunk, job_dir, spec['chunks'][index],
+                    spec['period'], spec['interval'], spec['params'], spec.get('source')
+                )
+            futures[future] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                rows = future.result()
+            except Exception:
+                _write_atomic(
+                    os.path.join(job_dir, 'chunks', f"{index:06d}.error"),
+                    traceback.format_exc(),
+                    mode='w'
+                )
+                continue
+            _write_atomic(_chunk_path(job_dir, index), pickle.dumps(rows))
+
+def _launch_runner(job_dir, workers=None):
+    """Start een losgekoppeld runner-proces dat sessies en reruns overleeft"""
+    cmd = [sys.executable, '-m', 'utils.job_queue', 'run', job_dir]
+    if workers:
+        cmd += ['--workers', str(workers)]
+    log = open(os.path.join(job_dir, 'runner.log'), 'ab')
+    process = subprocess.Popen(
+        cmd,
+        cwd=ROOT,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    log.close()
+
+    # Direct vastleggen, zodat de status meteen 'bezig' is
+    _write_atomic(os.path.join(job_dir, 'runner.pid'), str(process.pid), mode='w')
+
+def _create_job(kind, chunks, workers=None, data=None, **spec_fields):
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{uuid.uuid4().hex[:6]}"
+    job_dir = _job_path(job_id)
+    os.makedirs(os.path.join(job_dir, 'chunks'))
+
+    if data is not None:
+        _write_atomic(os.path.join(job_dir, 'data.pkl'), pickle.dumps(data))
+
+    spec = {
+        'id': job_id,
+        'kind': kind,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'n_chunks': len(chunks),
+        'chunks': chunks,
+        **spec_fields
+    }
+    _write_atomic(os.path.join(job_dir, 'spec.json'), json.dumps(spec), mode='w')
+    meta = {field: spec[field] for field in META_FIELDS}
+    _write_atomic(os.path.join(job_dir, 'meta.json'), json.dumps(meta), mode='w')
+    _launch_runner(job_dir, workers)
+    return job_id
+
+def submit_sweep(df, params_list, label=None, workers=None):
+    """
+    Start een parameter sweep op één prijsreeks (price1, price2)
+
+    Returns:
+        str: Job id
+    """
+    return _create_job(
+        'sweep',
+        _chunks(list(params_list), SWEEP_CHUNK_SIZE),
+        workers=workers,
+        data=df[['price1', 'price2']].copy(),
+        label=label or 'Parameter sweep'
+    )
+
+def submit_scan(pairs, period, interval, params, label=None, workers=None):
+    """
+    Start een universe scan: spread fit en backtest per pair
+
+    Returns:
+        str: Job id
+    """
+    return _create_job(
+        'scan',
+        _chunks([list(pair) for pair in pairs], SCAN_CHUNK_SIZE),
+        workers=workers,
+        period=period,
+        interval=interval,
+        params=params,
+        source=os.environ.get('PAIRY_DATA_SOURCE', 'yahoo'),
+        label=label or 'Universe scan'
+    )
+
+def _runner_alive(job_dir):
+    try:
+        with open(os.path.join(job_dir, 'runner.pid'), encoding='utf-8') as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return False
+
+    # Zombie processen tellen niet als levend
+    try:
+        with open(f"/proc/{pid}/stat", encoding='utf-8') as f:
+            return f.read().split()[2] != 'Z'
+    except OSError:
+        return True
+
+def job_status(job_id):
+    """Voortgang en toestand van een job"""
+    job_dir = _job_path(job_id)
+    meta = _read_meta(job_dir)
+    chunk_dir = os.path.join(job_dir, 'chunks')
+    files = os.listdir(chunk_dir) if os.path.isdir(chunk_dir) else []
+    done = sum(name.endswith('.pkl') for name in files)
+    failed = sum(name.endswith('.error') and name[:-6] + '.pkl' not in files for name in files)
+
+    if done == meta['n_chunks']:
+        state = 'voltooid'
+    elif _runner_alive(job_dir):
+        state = 'bezig'
+    elif done + failed == meta['n_chunks']:
+        state = 'mislukt'
+    else:
+        state = 'onderbroken'
+
+    return {
+        **meta,
+        'done': done,
+        'failed': failed,
+        'progress': done / meta['n_chunks'] if meta['n_chunks'] else 1.0,
+        'state': state
+    }
+
+def list_jobs(limit=None):
+    """Status van de nieuwste `limit` jobs (alle jobs als limit None is)"""
+    job_ids = [
+        job_id for job_id in sorted(os.listdir(jobs_dir()), reverse=True)
+        if os.path.exists(os.path.join(_job_path(job_id), 'spec.json'))
+    ]
+    return [job_status(job_id) for job_id in job_ids[:limit]]
+
+def resume_job(job_id, workers=None):
+    """Hervat een onderbroken job; voltooide chunks worden overgeslagen"""
+    job_dir = _job_path(job_id)
+    if _runner_alive(job_dir):
+        return False
+    for name in os.listdir(os.path.join(job_dir, 'chunks')):
+        if name.endswith('.error'):
+            os.remove(os.path.join(job_dir, 'chunks', name))
+    _launch_runner(job_dir, workers)
+    return True
+
+def job_results(job_id):
+    """Alle resultaten van de voltooide chunks als DataFrame"""
+    chunk_dir = os.path.join(_job_path(job_id), 'chunks')
+    rows = []
+    for name in sorted(os.listdir(chunk_dir)):
+        if name.endswith('.pkl'):
+            with open(os.path.join(chunk_dir, name), 'rb') as f:
+                rows.extend(pickle.load(f))
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job queue voor sweeps en scans")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help="Verwerk een job (runner-proces)")
+    run_parser.add_argument('job_dir')
+    run_parser.add_argument('--workers', type=int, default=None)
+    sub.add_parser('status', help="Toon alle jobs")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run_job(args.job_dir, args.workers)
+    else:
+        for status in list_jobs():
+            print(f"{status['id']}  {status['state']:<12} {status['done']}/{status['n_chunks']}")
+
+if __name__ == "__main__":
+    main()
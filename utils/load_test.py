@@ -0,0 +1,176 @@
+"""
+Load test voor de Streamlit app met gelijktijdige, gesimuleerde sessies
+
+Gebruik:
+    python -m utils.load_test --sessions 1,5,10,20 --steps 10
+    python -m utils.load_test --sessions 1,5,10 --threads
+
+Elke sessie draait main.py headless via Streamlit's testing API en doet
+realistische sidebar interacties: pair wisselen, sliders verschuiven en
+backtests draaien. Standaard wordt de synthetische databron gebruikt,
+zodat de test offline en reproduceerbaar is.
+
+Per concurrency-niveau worden p50/p95/p99 rerun latency, CPU gebruik en
+piek RSS (van de worker processen) gerapporteerd. Standaard draait elke
+sessie in een eigen proces. Met --threads delen de sessies één proces en
+dus de gedeelde caches, maar AppTest is niet thread-safe: fouten van de
+test harness zelf worden apart geteld ('Harness') en de koude rerun van
+de verse sessie daarna telt niet mee in de percentielen.
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / 'main.py')
+
+# Sidebar interacties met hun relatieve kans
+ACTIONS = [
+    ('switch_pair', 3),
+    ('zscore_slider', 3),
+    ('risk_slider', 2),
+    ('period', 1),
+    ('backtest', 2),
+]
+
+def _choose_action(rng):
+    names, weights = zip(*ACTIONS)
+    return rng.choices(names, weights=weights)[0]
+
+def _apply_action(at, action, rng):
+    """Voer één sidebar interactie uit op een AppTest sessie"""
+    if action == 'switch_pair':
+        coin1 = at.selectbox(key='sb_coin1')
+        coin1.set_value(rng.choice(coin1.options))
+    elif action == 'zscore_slider':
+        at.slider(key='sb_zscore_entry').set_value(round(rng.uniform(1.0, 3.0), 1))
+        at.slider(key='sb_zscore_exit').set_value(round(rng.uniform(0.0, 1.0), 1))
+    elif action == 'risk_slider':
+        at.slider(key='sb_stop_loss').set_value(rng.choice([2.5, 5.0, 7.5, 10.0]))
+        at.slider(key='sb_take_profit').set_value(rng.choice([5.0, 10.0, 20.0]))
+    elif action == 'period':
+        at.selectbox(key='sb_period').set_value(rng.choice(["1mo", "3mo", "6mo", "1y"]))
+    elif action == 'backtest':
+        checkbox = at.checkbox(key='sb_run_backtest')
+        checkbox.uncheck() if checkbox.value else checkbox.check()
+
+def run_session(session_index, steps, seed=0, timeout=120):
+    """
+    Simuleer één gebruiker
+
+    Returns:
+        dict: Latencies (seconden) per rerun, app fouten en harness fouten
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 100003 + session_index)
+    at = None
+    restarted = False
+    latencies = []
+    errors = []
+    harness_errors = []
+
+    for step in range(steps + 1):
+        try:
+            if at is None:
+                at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            elif step > 0:
+                _apply_action(at, _choose_action(rng), rng)
+
+            start = time.perf_counter()
+            at.run()
+        except Exception as e:
+            # Exceptions van de app zelf staan in at.exception; dit is AppTest
+            harness_errors.append(f"{type(e).__name__}: {e}")
+            # Na een mislukte run is de element tree onbetrouwbaar: verse sessie
+            at = None
+            restarted = True
+            continue
+        if not restarted:
+            latencies.append(time.perf_counter() - start)
+        restarted = False
+        errors.extend(str(el.value) for el in list(at.exception) + list(at.error))
+
+    return {'latencies': latencies, 'errors': errors, 'harness_errors': harness_errors}
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Piek RSS in MB (ru_maxrss is KB op Linux, bytes op macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _cpu_seconds(processes):
+    times = os.times()
+    if processes:
+        return times.children_user + times.children_system
+    return time.process_time()
+
+def run_level(concurrency, steps, seed=0, processes=True):
+    """Draai `concurrency` sessies tegelijk en verzamel de metrics"""
+    cpu_start = _cpu_seconds(processes)
+    wall_start = time.perf_counter()
+
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=concurrency) as pool:
+        results = list(pool.map(partial(run_session, steps=steps, seed=seed), range(concurrency)))
+
+    wall = time.perf_counter() - wall_start
+    cpu = _cpu_seconds(processes) - cpu_start
+    latencies = np.array([lat for r in results for lat in r['latencies']])
+
+    return {
+        'sessions': concurrency,
+        'reruns': len(latencies),
+        'errors': [msg for r in results for msg in r['errors']],
+        'harness_errors': [msg for r in results for msg in r['harness_errors']],
+        'p50_ms': np.percentile(latencies, 50) * 1000 if len(latencies) else float('nan'),
+        'p95_ms': np.percentile(latencies, 95) * 1000 if len(latencies) else float('nan'),
+        'p99_ms': np.percentile(latencies, 99) * 1000 if len(latencies) else float('nan'),
+        'cpu_pct': 100 * cpu / wall if wall > 0 else 0.0,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN if processes else resource.RUSAGE_SELF)
+    }
+
+def print_report(rows):
+    header = f"{'Sessies':>8} {'Reruns':>7} {'Fouten':>7} {'Harness':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'CPU %':>7} {'Piek RSS MB':>12}"
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(
+            f"{row['sessions']:>8} {row['reruns']:>7} {len(row['errors']):>7} {len(row['harness_errors']):>8} "
+            f"{row['p50_ms']:>9.0f} {row['p95_ms']:>9.0f} {row['p99_ms']:>9.0f} "
+            f"{row['cpu_pct']:>7.0f} {row['peak_rss_mb']:>12.0f}"
+        )
+
+    for title, field in (("Foutmeldingen", 'errors'), ("Harness fouten", 'harness_errors')):
+        messages = sorted({msg for row in rows for msg in row[field]})
+        if messages:
+            print(f"\n{title}:")
+            for msg in messages:
+                print(f"  - {msg}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test met gelijktijdige Streamlit sessies")
+    parser.add_argument('--sessions', default='1,5,10,20', help="Concurrency niveaus, komma-gescheiden")
+    parser.add_argument('--steps', type=int, default=10, help="Interacties per sessie")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--source', default='synthetic', help="Databron (PAIRY_DATA_SOURCE)")
+    parser.add_argument('--threads', action='store_true',
+                        help="Alle sessies als threads in één proces (gedeelde caches, AppTest niet thread-safe)")
+    args = parser.parse_args(argv)
+
+    os.environ['PAIRY_DATA_SOURCE'] = args.source
+
+    rows = []
+    for concurrency in [int(n) for n in args.sessions.split(',')]:
+        rows.append(run_level(concurrency, args.steps, args.seed, processes=not args.threads))
+    print_report(rows)
+    return rows
+
+if __name__ == "__main__":
+    main()
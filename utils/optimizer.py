@@ -0,0 +1,150 @@
+"""
+Adaptieve parameter optimalisatie met successive halving / Hyperband
+
+Veel kandidaten worden goedkoop geëvalueerd op een kort, recent stuk
+van de historie; alleen de beste 1/eta gaat door naar een eta keer
+langer stuk, tot de laatste ronde op de volledige historie draait.
+Kandidaten worden getrokken binnen de slider grenzen van de sidebar.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from constants.sliders import SLIDER_BOUNDS
+from utils.backtest import run_backtest, backtest_metrics
+
+# run_backtest parameter -> sidebar slider
+SEARCH_SPACE = {
+    'entry_threshold': 'zscore_entry',
+    'exit_threshold': 'zscore_exit',
+    'max_position_size': 'max_position',
+    'stop_loss_pct': 'stop_loss',
+    'take_profit_pct': 'take_profit'
+}
+
+MIN_SLICE_BARS = 30
+
+def _int_log(n, base):
+    """Grootste s met base ** s <= n (math.log(243, 3) geeft 4.999...)"""
+    s = 0
+    while base ** (s + 1) <= n:
+        s += 1
+    return s
+
+def _grid(bounds):
+    """Alle waarden die de slider kan aannemen"""
+    n_steps = int(round((bounds['max_value'] - bounds['min_value']) / bounds['step']))
+    values = bounds['min_value'] + bounds['step'] * np.arange(n_steps + 1)
+    return np.round(values, 6)
+
+def sample_candidates(n, base_params, rng, search_space=None):
+    """
+    Trek `n` unieke parameter sets op het slider raster
+
+    Combinaties waarbij de exit threshold niet onder de entry threshold
+    ligt worden overgeslagen (die zouden direct weer sluiten).
+    """
+    search_space = search_space or SEARCH_SPACE
+    grids = {name: _grid(SLIDER_BOUNDS[slider]) for name, slider in search_space.items()}
+
+    candidates, seen = [], set()
+    attempts = 0
+    while len(candidates) < n and attempts < n * 50:
+        attempts += 1
+        values = {name: float(rng.choice(grid)) for name, grid in grids.items()}
+        if values.get('exit_threshold', 0) >= values.get('entry_threshold', np.inf):
+            continue
+        key = tuple(sorted(values.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append({**base_params, **values})
+    return candidates
+
+def _evaluate(df, params, metric):
+    df_result, trades = run_backtest(df.copy(), **params)
+    metrics = backtest_metrics(df_result, trades, params['initial_capital'])
+    score = metrics[metric]
+    if metric == 'max_drawdown':
+        score = -score
+    return score, metrics
+
+def successive_halving(df, candidates, eta=3, min_fraction=None, metric='sharpe_ratio',
+                       progress=None):
+    """
+    Successive halving over tijd-slices van de historie
+
+    Args:
+        df (pd.DataFrame): DataFrame met price1 en price2
+        candidates (list): Parameter dicts voor run_backtest
+        eta (int): Reductiefactor per ronde
+        min_fraction (float): Fractie van de historie in de eerste ronde
+            (standaard zo dat de laatste ronde de volledige historie is)
+        metric (str): Metric uit backtest_metrics om op te sorteren
+        progress (callable): Optionele callback(ronde, totaal_rondes)
+
+    Returns:
+        pd.DataFrame: Eén rij per evaluatie met ronde, fractie, params en metrics
+    """
+    n_rounds = _int_log(len(candidates), eta) + 1
+    if min_fraction is None:
+        min_fraction = eta ** -(n_rounds - 1)
+
+    survivors = list(candidates)
+    history = []
+    for rung in range(n_rounds):
+        fraction = min(1.0, min_fraction * eta ** rung)
+        n_bars = max(MIN_SLICE_BARS, int(len(df) * fraction))
+        slice_df = df.iloc[-n_bars:]
+
+        scored = []
+        for params in survivors:
+            score, metrics = _evaluate(slice_df, params, metric)
+            scored.append((score, params))
+            history.append({'rung': rung, 'fraction': fraction, 'bars': len(slice_df),
+                            'score': score, **params, **metrics})
+
+        if progress:
+            progress(rung + 1, n_rounds)
+        if fraction >= 1.0 or len(survivors) == 1:
+            break
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        survivors = [params for _, params in scored[:max(1, len(scored) // eta)]]
+
+    return pd.DataFrame(history)
+
+def hyperband(df, base_params, max_candidates=81, eta=3, metric='sharpe_ratio', seed=0,
+              progress=None):
+    """
+    Hyperband: meerdere successive halving brackets met verschillende
+    afweging tussen aantal kandidaten en start-slice lengte
+
+    Returns:
+        pd.DataFrame: Alle evaluaties, met een 'bracket' kolom
+    """
+    rng = np.random.default_rng(seed)
+    s_max = _int_log(max_candidates, eta)
+
+    results = []
+    for bracket, s in enumerate(range(s_max, -1, -1)):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        candidates = sample_candidates(n, base_params, rng)
+        if not candidates:
+            continue
+        history = successive_halving(df, candidates, eta=eta, min_fraction=eta ** -s, metric=metric)
+        history['bracket'] = bracket
+        results.append(history)
+        if progress:
+            progress(bracket + 1, s_max + 1)
+
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+def best_params(history, base_params):
+    """Beste parameter set uit de evaluaties op de volledige historie"""
+    full = history[history['fraction'] >= 1.0]
+    if full.empty:
+        full = history[history['fraction'] == history['fraction'].max()]
+    best = full.sort_values('score', ascending=False).iloc[0]
+    return {name: best[name].item() if hasattr(best[name], 'item') else best[name] for name in base_params}
@@ -0,0 +1,423 @@
+"""
+Correlatie-geclusterde index van kandidaat pairs
+
+Gebruik:
+    python -m utils.pair_index update --period 6mo --interval 1d
+    python -m utils.pair_index show
+    python -m utils.pair_index check
+
+Alle pairs testen schaalt kwadratisch met het aantal tickers. De index
+houdt de return-correlatiematrix incrementeel bij (lopende sommen per
+ticker-paar) en groepeert tickers hiërarchisch (average linkage) in
+clusters. Spread fits, cointegratie tests en backtests hoeven dan alleen
+te draaien op pairs binnen hetzelfde of een naburig cluster.
+
+Alleen de eerste build clustert volledig. Een nieuwe dag data bijwerken
+kost O(n²): de sommen worden opgehoogd en elke ticker wordt zo nodig
+naar het cluster met de hoogste gemiddelde correlatie verplaatst.
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.pairy', 'pair_index.pkl')
+
+# Minimale gemiddelde correlatie binnen een cluster
+DEFAULT_THRESHOLD = 0.6
+
+# Clusters met minstens deze gemiddelde onderlinge correlatie zijn buren
+DEFAULT_NEIGHBOUR_THRESHOLD = 0.4
+
+# Minimale winst in gemiddelde correlatie voor een verplaatsing (tegen heen-en-weer springen)
+DEFAULT_MARGIN = 0.05
+
+# Tickers met minder gezamenlijke returns worden met alles gepaird
+MIN_PERIODS = 30
+
+def _relabel(labels):
+    """Hernummer cluster labels naar 0..k-1"""
+    return np.unique(labels, return_inverse=True)[1]
+
+def average_linkage(similarity, threshold):
+    """
+    Agglomeratieve clustering met average linkage
+
+    Voegt steeds de twee clusters met de hoogste gemiddelde onderlinge
+    similariteit samen, tot die onder `threshold` zakt. O(n³), alleen
+    bedoeld voor de eerste build.
+
+    Args:
+        similarity (np.ndarray): Symmetrische n×n matrix (bv. correlaties)
+        threshold (float): Minimale gemiddelde similariteit om samen te voegen
+
+    Returns:
+        np.ndarray: Cluster label per rij (0..k-1)
+    """
+    n = len(similarity)
+    sim = np.array(similarity, dtype=float)
+    np.fill_diagonal(sim, -np.inf)
+    sizes = np.ones(n)
+    labels = np.arange(n)
+
+    for _ in range(n - 1):
+        i, j = divmod(int(np.argmax(sim)), n)
+        if sim[i, j] < threshold:
+            break
+        # Lance-Williams update voor average linkage
+        merged = (sim[i] * sizes[i] + sim[j] * sizes[j]) / (sizes[i] + sizes[j])
+        sim[i, :] = merged
+        sim[:, i] = merged
+        sim[i, i] = -np.inf
+        sim[j, :] = -np.inf
+        sim[:, j] = -np.inf
+        sizes[i] += sizes[j]
+        labels[labels == j] = i
+
+    return _relabel(labels)
+
+def _cluster_sums(matrix, labels, n_clusters):
+    """Som van de kolommen per cluster in O(n²) (n×k resultaat)"""
+    order = np.argsort(labels, kind='stable')
+    starts = np.searchsorted(labels[order], np.arange(n_clusters))
+    return np.add.reduceat(matrix[:, order], starts, axis=1)
+
+class PairIndex:
+    """
+    Incrementele correlatiematrix en clusters voor een ticker universe
+
+    Per ticker-paar worden het aantal gezamenlijke log-returns en de
+    sommen Σr_i, Σr_i² en Σr_i·r_j bijgehouden, zodat de correlatie
+    (pairwise complete) altijd zonder de historie te herlezen volgt.
+    """
+
+    def __init__(self, tickers=(), threshold=DEFAULT_THRESHOLD,
+                 neighbour_threshold=DEFAULT_NEIGHBOUR_THRESHOLD, margin=DEFAULT_MARGIN,
+                 min_periods=MIN_PERIODS):
+        self.threshold = threshold
+        self.neighbour_threshold = neighbour_threshold
+        self.margin = margin
+        self.min_periods = min_periods
+
+        self.tickers = []
+        self.count = np.zeros((0, 0))
+        self.sum_x = np.zeros((0, 0))
+        self.sum_xx = np.zeros((0, 0))
+        self.sum_xy = np.zeros((0, 0))
+        self.last_prices = np.zeros(0)
+        self.last_timestamp = None
+
+        self.labels = None
+        self.neighbours = None
+        self.add_tickers(tickers)
+
+    def add_tickers(self, tickers):
+        """
+        Voeg nieuwe tickers toe (zonder historie, als eigen cluster)
+
+        Bestaande sommen blijven staan; de nieuwe rijen en kolommen
+        starten op nul.
+        """
+        new = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self.tickers]
+        if not new:
+            return
+
+        n_old, n_new = len(self.tickers), len(self.tickers) + len(new)
+        for name in ('count', 'sum_x', 'sum_xx', 'sum_xy'):
+            grown = np.zeros((n_new, n_new))
+            grown[:n_old, :n_old] = getattr(self, name)
+            setattr(self, name, grown)
+        self.last_prices = np.concatenate([self.last_prices, np.full(len(new), np.nan)])
+        self.tickers.extend(new)
+
+        if self.labels is not None:
+            first = self.labels.max() + 1 if len(self.labels) else 0
+            self.labels = np.concatenate([self.labels, first + np.arange(len(new))])
+            self._update_neighbours(self.correlation())
+
+    def update_returns(self, returns):
+        """
+        Verwerk een blok log-returns (T×n, NaN = ontbrekend)
+
+        Kost O(T·n²); er wordt niets opnieuw berekend uit de historie.
+        """
+        returns = np.atleast_2d(np.asarray(returns, dtype=float))
+        valid = np.isfinite(returns)
+        r = np.where(valid, returns, 0.0)
+        v = valid.astype(float)
+
+        self.count += v.T @ v
+        self.sum_x += r.T @ v
+        self.sum_xx += (r * r).T @ v
+        self.sum_xy += r.T @ r
+
+    def feed(self, prices_df, include_last=False):
+        """
+        Verwerk alle nieuwe, afgesloten bars uit een brede prijs-DataFrame
+
+        De laatste bar is meestal nog in vorming en wordt pas verwerkt
+        als er een nieuwere bar binnenkomt (zoals PairScanner.feed).
+
+        Args:
+            prices_df (pd.DataFrame): Index = tijd, kolommen = tickers
+            include_last (bool): Ook de laatste bar verwerken
+
+        Returns:
+            int: Aantal verwerkte bars
+        """
+        self.add_tickers(prices_df.columns)
+        frame = prices_df.reindex(columns=self.tickers).sort_index()
+        if self.last_timestamp is not None:
+            frame = frame[frame.index > self.last_timestamp]
+        if not include_last:
+            frame = frame.iloc[:-1]
+        if frame.empty:
+            return 0
+
+        # Returns ten opzichte van de laatst bekende prijs per ticker (gaten overbrugd)
+        values = frame.to_numpy(dtype=float)
+        filled = pd.DataFrame(np.vstack([self.last_prices, values])).ffill().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(values / filled[:-1])
+        returns[~(np.isfinite(values) & (values > 0) & (filled[:-1] > 0))] = np.nan
+
+        self.update_returns(returns)
+        self.last_prices = filled[-1]
+        self.last_timestamp = frame.index[-1]
+        return len(frame)
+
+    def correlation(self):
+        """Correlatiematrix van de returns (0 bij te weinig gezamenlijke data)"""
+        n, sx, sxy = self.count, self.sum_x, self.sum_xy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * sxy - sx * sx.T
+            var_x = n * self.sum_xx - sx * sx
+            corr = cov / np.sqrt(var_x * var_x.T)
+        corr[~np.isfinite(corr) | (n < self.min_periods)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1.0, 1.0)
+
+    def _observed(self):
+        return np.diag(self.count) >= self.min_periods
+
+    def build(self):
+        """Volledige clustering (eenmalig, O(n³))"""
+        corr = self.correlation()
+        self.labels = average_linkage(corr, self.threshold)
+        self._update_neighbours(corr)
+
+    def reassign(self):
+        """
+        Werk de clusters bij na nieuwe data in O(n²)
+
+        Tickers worden één voor één bekeken, zodat elke verplaatsing
+        meetelt voor de volgende (twee gecorreleerde singletons komen zo
+        samen in één cluster in plaats van van label te wisselen). Een
+        ticker gaat naar het cluster met de hoogste gemiddelde correlatie
+        als dat minstens `margin` beter is dan zijn huidige cluster; een
+        ticker die nergens meer boven de threshold past wordt een eigen
+        cluster. Per verplaatsing worden twee kolommen van de
+        clustersommen bijgewerkt (O(n)). Daarna worden clusters die samen
+        boven de threshold liggen samengevoegd.
+        """
+        if self.labels is None:
+            self.build()
+            return
+
+        corr = self.correlation()
+        labels = self.labels.copy()
+        n = len(labels)
+        n_clusters = labels.max() + 1 if n else 0
+
+        # Ruimte voor maximaal n nieuwe (afgesplitste) clusters
+        sums = np.zeros((n, n_clusters + n))
+        sums[:, :n_clusters] = _cluster_sums(corr, labels, n_clusters)
+        sizes = np.zeros(n_clusters + n)
+        sizes[:n_clusters] = np.bincount(labels, minlength=n_clusters)
+        next_label = n_clusters
+
+        for i in range(n):
+            current = labels[i]
+
+            # Gemiddelde correlatie met elk cluster, zonder de ticker zelf
+            row = sums[i, :next_label].copy()
+            members = sizes[:next_label].copy()
+            row[current] -= corr[i, i]
+            members[current] -= 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(members > 0, row / members, -np.inf)
+
+            own = mean[current]
+            best = int(np.argmax(mean))
+            if best != current and mean[best] >= self.threshold and mean[best] - own > self.margin:
+                target = best
+            elif np.isfinite(own) and own < self.threshold - self.margin:
+                target = next_label
+                next_label += 1
+            else:
+                continue
+
+            sums[:, current] -= corr[:, i]
+            sums[:, target] += corr[:, i]
+            sizes[current] -= 1
+            sizes[target] += 1
+            labels[i] = target
+
+        self.labels = self._merge_clusters(corr, _relabel(labels))
+        self._update_neighbours(corr)
+
+    def _merge_clusters(self, corr, labels):
+        """
+        Voeg clusters samen waarvan de gemiddelde onderlinge correlatie
+        boven de threshold ligt (het average linkage criterium van build)
+
+        Elk cluster wordt per aanroep hooguit één keer samengevoegd, de
+        sterkste paren eerst; zo blijft een update O(n²) en groeien de
+        clusters over opeenvolgende updates naar die van een build.
+        """
+        n_clusters = labels.max() + 1 if len(labels) else 0
+        sizes = np.bincount(labels, minlength=n_clusters).astype(float)
+        sums = _cluster_sums(corr, labels, n_clusters)
+        between = _cluster_sums(sums.T, labels, n_clusters).T / np.outer(sizes, sizes)
+
+        first, second = np.nonzero(np.triu(between >= self.threshold, k=1))
+        target = np.arange(n_clusters)
+        used = np.zeros(n_clusters, dtype=bool)
+        for k in np.argsort(-between[first, second], kind='stable'):
+            a, b = first[k], second[k]
+            if used[a] or used[b]:
+                continue
+            target[b] = a
+            used[a] = used[b] = True
+        return _relabel(target[labels])
+
+    def agreement(self):
+        """
+        Overeenstemming van de huidige clusters met een volledige build
+
+        Fractie van de ticker pairs waarvoor beide indelingen het eens
+        zijn over 'zelfde cluster of niet' (Rand index, O(n³) door de
+        build). Bedoeld om drift van de incrementele updates te meten.
+        """
+        if self.labels is None:
+            self.build()
+        rebuilt = average_linkage(self.correlation(), self.threshold)
+        same_now = self.labels[:, None] == self.labels[None, :]
+        same_rebuilt = rebuilt[:, None] == rebuilt[None, :]
+        upper = np.triu_indices(len(self.labels), k=1)
+        return float((same_now == same_rebuilt)[upper].mean()) if len(upper[0]) else 1.0
+
+    def _update_neighbours(self, corr):
+        """Gemiddelde correlatie tussen clusters -> buren matrix (O(n²))"""
+        n_clusters = self.labels.max() + 1
+        sizes = np.bincount(self.labels, minlength=n_clusters).astype(float)
+        sums = _cluster_sums(corr, self.labels, n_clusters)
+        between = _cluster_sums(sums.T, self.labels, n_clusters).T
+        self.neighbours = between / np.outer(sizes, sizes) >= self.neighbour_threshold
+
+    def clusters(self):
+        """Tickers per cluster, grootste cluster eerst"""
+        if self.labels is None:
+            self.build()
+        groups = {}
+        for ticker, label in zip(self.tickers, self.labels):
+            groups.setdefault(int(label), []).append(ticker)
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def candidate_pairs(self, tickers=None):
+        """
+        Pairs binnen hetzelfde of een naburig cluster
+
+        Tickers die de index (nog) niet kent of met te weinig historie
+        worden met alle andere tickers gepaird.
+
+        Args:
+            tickers (list): Universe om uit te kiezen (standaard alle tickers)
+
+        Returns:
+            list: (ticker1, ticker2) tuples in dezelfde volgorde als
+                itertools.combinations
+        """
+        if self.labels is None:
+            self.build()
+
+        tickers = self.tickers if tickers is None else list(tickers)
+        position = {ticker: i for i, ticker in enumerate(self.tickers)}
+        idx = np.array([position.get(ticker, -1) for ticker in tickers], dtype=int)
+        known = idx >= 0
+        known[known] = self._observed()[idx[known]]
+        labels = np.where(known, self.labels[np.maximum(idx, 0)], 0)
+
+        both = known[:, None] & known[None, :]
+        related = self.neighbours[labels[:, None], labels[None, :]] | (labels[:, None] == labels[None, :])
+        mask = np.triu(~both | related, k=1)
+
+        return [(tickers[a], tickers[b]) for a, b in zip(*np.nonzero(mask))]
+
+    def save(self, path=None):
+        """Sla de index atomair op"""
+        path = path or index_path()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+def index_path():
+    """Pad van de opgeslagen index; in te stellen via PAIRY_PAIR_INDEX_PATH"""
+    return os.environ.get('PAIRY_PAIR_INDEX_PATH', DEFAULT_PATH)
+
+def load_pair_index(path=None):
+    """Laad de opgeslagen index (None als er nog geen is)"""
+    try:
+        with open(path or index_path(), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+def main(argv=None):
+    from constants.tickers import tickers
+    from utils.signal_scanner import load_prices, RECENT_PERIOD
+    # Via het pakket importeren, zodat de pickle niet naar __main__ verwijst
+    from utils.pair_index import PairIndex
+
+    parser = argparse.ArgumentParser(description="Correlatie clusters voor kandidaat pairs")
+    sub = parser.add_subparsers(dest='command', required=True)
+    update_parser = sub.add_parser('update', help="Verwerk nieuwe data (bouwt de index bij de eerste keer)")
+    update_parser.add_argument('--period', default='6mo', help="Historie voor de eerste build")
+    update_parser.add_argument('--interval', default='1d')
+    update_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    sub.add_parser('show', help="Toon clusters en aantal kandidaat pairs")
+    sub.add_parser('check', help="Vergelijk de clusters met een volledige build")
+    args = parser.parse_args(argv)
+
+    path = index_path()
+    index = load_pair_index(path)
+
+    if args.command == 'update':
+        universe = list(tickers.values())
+        if index is None:
+            index = PairIndex(universe, threshold=args.threshold)
+            period = args.period
+        else:
+            index.add_tickers(universe)
+            period = RECENT_PERIOD.get(args.interval, '5d')
+        bars = index.feed(load_prices(universe, period, args.interval))
+        index.reassign()
+        index.save(path)
+        print(f"{bars} nieuwe bars verwerkt")
+    elif index is None:
+        parser.error(f"Geen index gevonden in {path}, draai eerst 'update'")
+    elif args.command == 'check':
+        print(f"Overeenstemming met volledige build: {index.agreement():.1%}")
+        return
+
+    n = len(index.tickers)
+    print(f"{len(index.clusters())} clusters, {len(index.candidate_pairs())} van {n * (n - 1) // 2} pairs kandidaat")
+    for members in index.clusters():
+        print("  " + ", ".join(members))
+
+if __name__ == "__main__":
+    main()
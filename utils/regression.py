@@ -0,0 +1,40 @@
+import numpy as np
+
+def fit_ols(x, y):
+    """
+    Gesloten-vorm kleinste-kwadraten fit van y = alpha + beta * x
+
+    Vervangt sklearn's LinearRegression voor de één-feature regressie,
+    zodat alleen NumPy nodig is bij het opstarten.
+
+    Args:
+        x (array-like): Onafhankelijke variabele (price1)
+        y (array-like): Afhankelijke variabele (price2)
+
+    Returns:
+        dict: alpha, beta en r_squared van de fit
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    dy = y - y_mean
+
+    sxx = dx @ dx
+    sxy = dx @ dy
+    syy = dy @ dy
+
+    beta = sxy / sxx if sxx > 0 else 0.0
+    alpha = y_mean - beta * x_mean
+
+    # Residuele kwadratensom volgt direct uit de gecentreerde sommen
+    ss_res = max(syy - beta * sxy, 0.0)
+    r_squared = 1.0 - ss_res / syy if syy > 0 else 0.0
+
+    return {
+        'alpha': float(alpha),
+        'beta': float(beta),
+        'r_squared': float(r_squared)
+    }
@@ -0,0 +1,213 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TTL = 3600
+
+# Ververs op de achtergrond zodra een frame deze fractie van de TTL oud is
+DEFAULT_REFRESH_AHEAD = 0.8
+
+# Wachttijd (s) na een mislukte verversing voor een nieuwe poging
+DEFAULT_RETRY_AFTER = 60
+
+# Eén worker: yfinance deelt module-brede state tussen downloads
+REFRESH_WORKERS = 1
+
+# Sidebar intervallen: lengte in minuten en pandas resample regel
+INTERVAL_MINUTES = {
+    '30m': 30,
+    '1h': 60,
+    '1d': 1440
+}
+
+INTERVAL_RULES = {
+    '30m': '30min',
+    '1h': '1h',
+    '1d': '1D'
+}
+
+# Maximale historie per interval bij Yahoo Finance (None = onbeperkt)
+MAX_LOOKBACK_DAYS = {
+    '30m': 60,
+    '1h': 730,
+    '1d': None
+}
+
+PERIOD_DAYS = {
+    '5d': 5,
+    '1mo': 31,
+    '3mo': 92,
+    '6mo': 183,
+    '1y': 366,
+    '2y': 731
+}
+
+# Aggregatie per kolom; onbekende kolommen nemen de laatste waarde
+OHLC_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+    'price': 'last'
+}
+
+# Periodes waarvoor de sidebar intraday intervallen aanbiedt; voor langere
+# periodes is alleen 1d beschikbaar en heeft een fijner basisframe geen zin
+INTRADAY_PERIODS = ('5d', '1mo', '3mo')
+
+def base_interval(period, interval):
+    """
+    Fijnste interval waaruit `interval` afgeleid kan worden voor deze periode
+
+    Valt terug op het gevraagde interval als er geen fijnere bron is die
+    de volledige periode dekt.
+    """
+    if interval not in INTERVAL_MINUTES or period not in INTRADAY_PERIODS:
+        return interval
+
+    candidates = sorted(INTERVAL_MINUTES, key=INTERVAL_MINUTES.get)
+    for candidate in candidates:
+        if INTERVAL_MINUTES[candidate] > INTERVAL_MINUTES[interval]:
+            break
+        # Alleen intervallen waarin het doel precies past
+        if INTERVAL_MINUTES[interval] % INTERVAL_MINUTES[candidate]:
+            continue
+        lookback = MAX_LOOKBACK_DAYS[candidate]
+        if lookback is None or PERIOD_DAYS[period] <= lookback:
+            return candidate
+    return interval
+
+def resample_ohlc(frame, interval):
+    """Vectoriseerde OHLC aggregatie naar een grover interval"""
+    agg = {col: OHLC_AGG.get(col, 'last') for col in frame.columns}
+    resampled = frame.resample(INTERVAL_RULES[interval], label='left', closed='left').agg(agg)
+    return resampled.dropna(subset=['price'] if 'price' in resampled.columns else None, how='all')
+
+class TimeframeStore:
+    """
+    Slaat per ticker alleen het fijnste interval op en leidt grovere
+    timeframes daar lokaal uit af
+
+    Afgeleide frames worden per (ticker, periode, interval) bewaard en
+    blijven geldig zolang het basisframe niet ververst is.
+
+    Alleen de allereerste fetch van een basisframe blokkeert; een lege
+    of mislukte eerste fetch wordt niet bewaard maar als fout
+    doorgegeven, zodat de volgende aanvraag het opnieuw probeert. Daarna
+    wordt een frame dat `refresh_ahead * ttl` oud is op de achtergrond
+    opnieuw opgehaald, terwijl het laatste goede frame geserveerd blijft
+    (stale-while-revalidate). Een geslaagde verversing vervangt het frame
+    in één toewijzing; een mislukte laat het oude frame staan en wordt
+    na `retry_after` seconden opnieuw geprobeerd.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, refresh_ahead=DEFAULT_REFRESH_AHEAD,
+                 retry_after=DEFAULT_RETRY_AFTER, workers=REFRESH_WORKERS):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_after = retry_after
+        self.workers = workers
+        self._base = {}
+        self._derived = {}
+        self._key_locks = {}
+        self._refreshing = set()
+        self._failed_at = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _get_base(self, source, fetch, ticker, period, interval):
+        key = (source, ticker, period, interval)
+        entry = self._base.get(key)
+        if entry is None:
+            with self._key_lock(key):
+                # Een andere thread kan intussen al geladen hebben
+                entry = self._base.get(key)
+                if entry is None:
+                    entry = (time.time(), self._fetch(fetch, ticker, period, interval))
+                    self._base[key] = entry
+                    return entry
+
+        if time.time() - entry[0] >= self.ttl * self.refresh_ahead:
+            self._schedule_refresh(key, fetch)
+        return entry
+
+    @staticmethod
+    def _fetch(fetch, ticker, period, interval):
+        """Fetch een basisframe; een lege download geldt als fout (yfinance gooit niet)"""
+        frame = fetch(ticker, period, interval)
+        if frame is None or frame.empty:
+            raise ValueError(f"Geen data ontvangen voor {ticker}")
+        return frame
+
+    def _schedule_refresh(self, key, fetch):
+        """Plan een achtergrond verversing (hooguit één tegelijk per sleutel)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            failed_at = self._failed_at.get(key)
+            if failed_at is not None and time.time() - failed_at < self.retry_after:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='pairy-refresh'
+                )
+        self._executor.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key, fetch):
+        _, ticker, period, interval = key
+        try:
+            frame = self._fetch(fetch, ticker, period, interval)
+        except Exception:
+            # Laatste goede frame blijft staan
+            with self._lock:
+                self._failed_at[key] = time.time()
+                self._refreshing.discard(key)
+            return
+
+        with self._lock:
+            self._base[key] = (time.time(), frame)
+            self._failed_at.pop(key, None)
+            self._refreshing.discard(key)
+
+    def get(self, source, fetch, ticker, period, interval):
+        """
+        Haal data op voor (ticker, periode, interval)
+
+        Args:
+            source (str): Naam van de databron (deel van de cache-sleutel)
+            fetch (callable): Fetch functie van de databron
+        """
+        base = base_interval(period, interval)
+        fetched_at, base_frame = self._get_base(source, fetch, ticker, period, base)
+        if base == interval:
+            return base_frame
+
+        key = (source, ticker, period, interval)
+        with self._lock:
+            cached = self._derived.get(key)
+        if cached is not None and cached[0] == fetched_at:
+            return cached[1]
+
+        frame = resample_ohlc(base_frame, interval)
+        with self._lock:
+            self._derived[key] = (fetched_at, frame)
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._base.clear()
+            self._derived.clear()
+            self._failed_at.clear()
+
+_default_store = TimeframeStore()
+
+def get_timeframe_store():
+    """Proces-brede store (overleeft Streamlit reruns)"""
+    return _default_store
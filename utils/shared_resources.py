@@ -0,0 +1,227 @@
+import sys
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Sessies krijgen een shallow copy van gedeelde frames; pas met
+# copy-on-write (standaard vanaf pandas 3) raakt een wijziging daarin
+# het gedeelde object niet. runtime.txt (Python 3.9) installeert pandas 2.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def current_session_id():
+    """Session id van de huidige Streamlit sessie (None buiten de runtime)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+def _is_active_session(session_id):
+    """Controleer of een sessie nog verbonden is"""
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.instance().is_active_session(session_id)
+    except Exception:
+        # Buiten de runtime kunnen we het niet weten: niet opruimen
+        return True
+
+def _session_view(value):
+    """
+    Eigen kopie van een gedeelde waarde voor één sessie
+
+    DataFrames worden shallow gekopieerd (geen data kopie); door
+    copy-on-write kopieert een wijziging alleen de aangeraakte kolom.
+    Dicts (spread modellen) worden los gekopieerd.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+def _nbytes(value):
+    """Geheugengebruik van een gedeelde waarde in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+    return sys.getsizeof(value)
+
+def _is_empty(value):
+    return value is None or (isinstance(value, pd.DataFrame) and value.empty)
+
+class SharedResources:
+    """
+    Proces-brede opslag voor prijsdata en gefitte spread modellen
+
+    Alle sessies delen dezelfde data; elke aanvraag krijgt een shallow
+    copy, zodat een sessie het gedeelde object niet kan wijzigen. Per
+    sleutel wordt bijgehouden welke sessies hem gebruiken (reference
+    count), zodat ongebruikte entries bij geheugendruk als eerste
+    verwijderd worden. Verversen gebeurt met een lock per sleutel: één
+    sessie laadt, de rest wacht en deelt daarna dezelfde data.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = {}
+        self._key_locks = {}
+        self._session_keys = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fresh_entry(self, key, ttl):
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry['loaded_at'] < ttl:
+            return entry
+        return None
+
+    def get(self, key, loader, session_id=None, ttl=None):
+        """
+        Haal een gedeelde waarde op en laad hem indien nodig
+
+        Args:
+            key (tuple): Sleutel van de resource
+            loader (callable): Functie die de waarde (opnieuw) laadt
+            session_id (str): Sessie die de waarde gebruikt
+            ttl (float): Maximale leeftijd in seconden
+
+        Returns:
+            Een sessie-kopie van de gedeelde waarde
+        """
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            entry = self._fresh_entry(key, ttl)
+            if entry is not None:
+                self._acquire(key, session_id)
+                return _session_view(entry['value'])
+
+        with self._key_lock(key):
+            # Een andere sessie kan intussen al geladen hebben
+            with self._lock:
+                entry = self._fresh_entry(key, ttl)
+                if entry is not None:
+                    self._acquire(key, session_id)
+                    return _session_view(entry['value'])
+
+            value = loader()
+            if _is_empty(value):
+                return value
+
+            with self._lock:
+                previous = self._entries.get(key)
+                version = previous['version'] if previous else 0
+                if previous is None or previous['value'] is not value:
+                    version += 1
+                self._entries[key] = {
+                    'value': value,
+                    'loaded_at': time.time(),
+                    'bytes': _nbytes(value),
+                    'version': version,
+                    'sessions': previous['sessions'] if previous else set()
+                }
+                self._acquire(key, session_id)
+                self._evict()
+
+        return _session_view(value)
+
+    def _acquire(self, key, session_id):
+        if session_id is None:
+            return
+        self._entries[key]['sessions'].add(session_id)
+        self._session_keys.setdefault(session_id, set()).add(key)
+
+    def release(self, session_id, keep=()):
+        """Geef alle sleutels van een sessie vrij, behalve die in `keep`"""
+        if session_id is None:
+            return
+        keep = set(keep)
+        with self._lock:
+            held = self._session_keys.get(session_id, set())
+            for key in held - keep:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['sessions'].discard(session_id)
+            if keep:
+                self._session_keys[session_id] = held & keep
+            else:
+                self._session_keys.pop(session_id, None)
+
+    def _prune_sessions(self):
+        """Verwijder referenties van sessies die niet meer verbonden zijn"""
+        for session_id in list(self._session_keys):
+            if _is_active_session(session_id):
+                continue
+            for key in self._session_keys.pop(session_id):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry['sessions'].discard(session_id)
+
+    def _evict(self):
+        """Verwijder ongebruikte entries (oudste eerst) bij geheugendruk"""
+        if self._total_bytes() <= self.max_bytes:
+            return
+        self._prune_sessions()
+        unused = sorted(
+            (entry['loaded_at'], key) for key, entry in self._entries.items()
+            if not entry['sessions']
+        )
+        for _, key in unused:
+            if self._total_bytes() <= self.max_bytes:
+                break
+            del self._entries[key]
+
+    def _total_bytes(self):
+        return sum(entry['bytes'] for entry in self._entries.values())
+
+    def version(self, key):
+        """
+        Versienummer van een sleutel; verhoogt alleen als de loader een
+        ander object teruggaf (0 als de sleutel niet geladen is)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['version'] if entry is not None else 0
+
+    def invalidate(self, key):
+        """Forceer een herlaad bij de volgende aanvraag"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['loaded_at'] = 0
+
+    def memory_report(self):
+        """Geheugengebruik en reference count per sleutel"""
+        with self._lock:
+            self._prune_sessions()
+            entries = [
+                {
+                    'key': key,
+                    'bytes': entry['bytes'],
+                    'refcount': len(entry['sessions']),
+                    'age_s': time.time() - entry['loaded_at']
+                }
+                for key, entry in self._entries.items()
+            ]
+            return {
+                'total_bytes': sum(e['bytes'] for e in entries),
+                'sessions': len(self._session_keys),
+                'entries': entries
+            }
+
+@st.cache_resource
+def get_shared_resources():
+    """Eén gedeelde instantie per server proces"""
+    return SharedResources()
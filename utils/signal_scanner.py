@@ -0,0 +1,308 @@
+"""
+Headless signal scanner voor alle ticker pairs
+
+Gebruik:
+    python -m utils.signal_scanner --sink log:signals.log
+    python -m utils.signal_scanner --sink sqlite:signals.db --interval 1h --period 1mo
+    python -m utils.signal_scanner --sink webhook:http://localhost:8000/alerts --once
+    python -m utils.signal_scanner --sink log:signals.log --prune
+
+Per pair wordt de OLS fit incrementeel bijgehouden (lopende gemiddelden
+en co-momenten), zodat een nieuwe bar O(pairs) kost in plaats van een
+volledige herberekening. De spread en z-score zijn identiek aan
+preprocess_data op de afgesloten bars: residu van de volledige-sample
+fit, gedeeld door de standaarddeviatie van de residuen. De laatste,
+nog lopende bar wordt pas verwerkt als er een nieuwere binnenkomt.
+"""
+import argparse
+import itertools
+import json
+import logging
+import sqlite3
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from utils.signals import classify_signal, LONG, EXIT
+
+logger = logging.getLogger(__name__)
+
+# Poll periode per interval: genoeg om gemiste bars in te halen
+RECENT_PERIOD = {'1d': '5d', '1h': '5d', '30m': '5d'}
+
+class PairScanner:
+    """
+    Incrementele spread en z-score status voor een set ticker pairs
+
+    Alle pairs worden als NumPy arrays bijgehouden; één update verwerkt
+    een nieuwe bar voor alle pairs tegelijk.
+    """
+
+    def __init__(self, tickers, pairs=None, entry_threshold=2.0, exit_threshold=0.5):
+        self.tickers = list(tickers)
+        self.entry_threshold = entry_threshold
+        self.exit_threshold = exit_threshold
+
+        index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.pairs = list(pairs) if pairs is not None else list(itertools.combinations(self.tickers, 2))
+        self._i = np.array([index[a] for a, _ in self.pairs], dtype=int)
+        self._j = np.array([index[b] for _, b in self.pairs], dtype=int)
+
+        n_pairs = len(self.pairs)
+        self.n = np.zeros(n_pairs)
+        self.mean_x = np.zeros(n_pairs)
+        self.mean_y = np.zeros(n_pairs)
+        self.cxx = np.zeros(n_pairs)
+        self.cxy = np.zeros(n_pairs)
+        self.cyy = np.zeros(n_pairs)
+        self.last_x = np.full(n_pairs, np.nan)
+        self.last_y = np.full(n_pairs, np.nan)
+
+        # 0 = geen positie, 1 = long spread, -1 = short spread
+        self.position = np.zeros(n_pairs, dtype=np.int8)
+        self.last_timestamp = None
+
+    def update(self, timestamp, prices):
+        """
+        Verwerk één bar en retourneer de entry/exit events
+
+        Args:
+            timestamp: Tijdstip van de bar
+            prices (array-like): Prijs per ticker (NaN = ontbrekend)
+
+        Returns:
+            list: Events (dicts) voor pairs waarvan de positie wijzigt
+        """
+        prices = np.asarray(prices, dtype=float)
+        x = prices[self._i]
+        y = prices[self._j]
+        valid = ~(np.isnan(x) | np.isnan(y))
+
+        # Welford update van gemiddelden en co-momenten (alleen geldige pairs)
+        n = self.n + valid
+        safe_n = np.where(n > 0, n, 1)
+        dx = np.where(valid, x - self.mean_x, 0.0)
+        dy = np.where(valid, y - self.mean_y, 0.0)
+        self.mean_x = self.mean_x + dx / safe_n
+        self.mean_y = self.mean_y + dy / safe_n
+        self.cxx = self.cxx + dx * np.where(valid, x - self.mean_x, 0.0)
+        self.cxy = self.cxy + dx * np.where(valid, y - self.mean_y, 0.0)
+        self.cyy = self.cyy + dy * np.where(valid, y - self.mean_y, 0.0)
+        self.n = n
+        self.last_x = np.where(valid, x, self.last_x)
+        self.last_y = np.where(valid, y, self.last_y)
+        self.last_timestamp = timestamp
+
+        zscore, alpha, beta = self.zscores()
+        return self._transitions(timestamp, zscore, alpha, beta, valid)
+
+    def zscores(self):
+        """Huidige z-score, alpha en beta per pair"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(self.cxx > 0, self.cxy / self.cxx, np.nan)
+            alpha = self.mean_y - beta * self.mean_x
+            ss_res = np.maximum(self.cyy - beta * self.cxy, 0.0)
+            spread_std = np.sqrt(ss_res / (self.n - 1))
+            spread = self.last_y - (alpha + beta * self.last_x)
+            zscore = np.where((self.n > 2) & (spread_std > 0), spread / spread_std, np.nan)
+        return zscore, alpha, beta
+
+    def _transitions(self, timestamp, zscore, alpha, beta, valid):
+        events = []
+        long_entry = zscore < -self.entry_threshold
+        short_entry = zscore > self.entry_threshold
+        exit_signal = np.abs(zscore) < self.exit_threshold
+
+        flat = valid & (self.position == 0)
+        enter_long = flat & long_entry
+        enter_short = flat & short_entry & ~long_entry
+        leave = valid & (self.position != 0) & exit_signal & ~long_entry & ~short_entry
+
+        for k in np.flatnonzero(enter_long | enter_short | leave):
+            signal = classify_signal(zscore[k], self.entry_threshold, self.exit_threshold)
+            side = self.position[k] if signal == EXIT else (1 if signal == LONG else -1)
+            events.append({
+                'timestamp': pd.Timestamp(timestamp).isoformat(),
+                'coin1': self.pairs[k][0],
+                'coin2': self.pairs[k][1],
+                'event': 'exit' if signal == EXIT else 'entry',
+                'side': 'Long Spread' if side == 1 else 'Short Spread',
+                'zscore': float(zscore[k]),
+                'alpha': float(alpha[k]),
+                'beta': float(beta[k])
+            })
+
+        self.position[enter_long] = 1
+        self.position[enter_short] = -1
+        self.position[leave] = 0
+        return events
+
+    def feed(self, prices_df, include_last=False):
+        """
+        Verwerk alle nieuwe, afgesloten bars uit een brede prijs-DataFrame
+
+        De laatste bar van een download is meestal nog in vorming (de
+        prijs verandert tot de bar sluit). Die wordt pas verwerkt als er
+        een nieuwere bar binnenkomt, zodat de lopende sommen alleen
+        definitieve prijzen bevatten.
+
+        Args:
+            prices_df (pd.DataFrame): Index = tijd, kolommen = tickers
+            include_last (bool): Ook de laatste bar verwerken (bv. als de
+                data al volledig afgesloten is)
+
+        Returns:
+            list: Alle events in chronologische volgorde
+        """
+        frame = prices_df.reindex(columns=self.tickers).sort_index()
+        if self.last_timestamp is not None:
+            frame = frame[frame.index > self.last_timestamp]
+        if not include_last:
+            frame = frame.iloc[:-1]
+
+        events = []
+        for timestamp, row in zip(frame.index, frame.to_numpy(dtype=float)):
+            events.extend(self.update(timestamp, row))
+        return events
+
+class LogFileSink:
+    """Schrijf events als JSON regels naar een logbestand"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, event):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + '\n')
+
+class WebhookSink:
+    """POST events als JSON naar een (lokale) webhook"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, event):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(event).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            logger.warning("Webhook %s niet bereikbaar: %s", self.url, e)
+
+class SQLiteSink:
+    """Sla events op in een SQLite tabel"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS signal_events (
+                timestamp TEXT, coin1 TEXT, coin2 TEXT, event TEXT,
+                side TEXT, zscore REAL, alpha REAL, beta REAL
+            )
+        """)
+        self.conn.commit()
+
+    def emit(self, event):
+        self.conn.execute(
+            "INSERT INTO signal_events VALUES "
+            "(:timestamp, :coin1, :coin2, :event, :side, :zscore, :alpha, :beta)",
+            event
+        )
+        self.conn.commit()
+
+SINKS = {
+    'log': LogFileSink,
+    'webhook': WebhookSink,
+    'sqlite': SQLiteSink
+}
+
+def make_sink(spec):
+    """Maak een sink van een specificatie als 'sqlite:signals.db'"""
+    kind, _, target = spec.partition(':')
+    if kind not in SINKS or not target:
+        raise ValueError(f"Onbekende sink '{spec}', verwacht een van: {', '.join(SINKS)}")
+    return SINKS[kind](target)
+
+def load_prices(tickers, period, interval, fetch=None):
+    """Laad slotkoersen voor alle tickers als brede DataFrame"""
+    if fetch is None:
+        # Rechtstreeks van de bron: de scanner moet nieuwe bars zien
+        # zonder te wachten op het verlopen van de timeframe cache
+        from utils.data_loader import get_source
+        fetch = get_source()
+
+    columns = {}
+    for ticker in tickers:
+        try:
+            columns[ticker] = fetch(ticker, period, interval)['price']
+        except Exception as e:
+            logger.warning("Geen data voor %s: %s", ticker, e)
+    return pd.DataFrame(columns)
+
+def run(tickers, sink, period='6mo', interval='1d', entry_threshold=2.0,
+        exit_threshold=0.5, poll_seconds=300, once=False, fetch=None, prune=False):
+    """
+    Start de scanner: warm op met historie en verwerk daarna nieuwe bars
+
+    Tijdens het opwarmen worden geen events verstuurd; alleen de
+    posities worden opgebouwd zodat latere exits kloppen. Met `prune`
+    worden alleen pairs binnen dezelfde of naburige correlatie clusters
+    gevolgd (zie utils.pair_index).
+    """
+    history = load_prices(tickers, period, interval, fetch)
+    pairs = None
+    if prune:
+        from utils.pair_index import PairIndex
+        index = PairIndex(tickers)
+        index.feed(history)
+        pairs = index.candidate_pairs()
+
+    scanner = PairScanner(tickers, pairs=pairs, entry_threshold=entry_threshold, exit_threshold=exit_threshold)
+    scanner.feed(history)
+    logger.info("Scanner opgewarmd: %d pairs, %d bars", len(scanner.pairs), len(history))
+
+    while not once:
+        time.sleep(poll_seconds)
+        recent = load_prices(tickers, RECENT_PERIOD.get(interval, '5d'), interval, fetch)
+        for event in scanner.feed(recent):
+            sink.emit(event)
+        logger.info("Bars verwerkt tot %s", scanner.last_timestamp)
+
+    return scanner
+
+def main(argv=None):
+    from constants.tickers import tickers
+
+    parser = argparse.ArgumentParser(description="Scan alle pairs op z-score signalen")
+    parser.add_argument('--sink', required=True, help="log:<pad>, webhook:<url> of sqlite:<pad>")
+    parser.add_argument('--period', default='6mo')
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--entry', type=float, default=2.0, help="Z-score entry threshold")
+    parser.add_argument('--exit', type=float, default=0.5, help="Z-score exit threshold")
+    parser.add_argument('--poll', type=float, default=300, help="Seconden tussen updates")
+    parser.add_argument('--once', action='store_true', help="Alleen opwarmen en stoppen")
+    parser.add_argument('--prune', action='store_true', help="Alleen pairs binnen correlatie clusters")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run(
+        list(tickers.values()),
+        make_sink(args.sink),
+        period=args.period,
+        interval=args.interval,
+        entry_threshold=args.entry,
+        exit_threshold=args.exit,
+        poll_seconds=args.poll,
+        once=args.once,
+        prune=args.prune
+    )
+
+if __name__ == "__main__":
+    main()
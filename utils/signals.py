@@ -0,0 +1,21 @@
+LONG = 'long'
+SHORT = 'short'
+EXIT = 'exit'
+
+def classify_signal(zscore, entry_threshold, exit_threshold):
+    """
+    Bepaal het trading signaal voor één z-score
+
+    Volgorde is gelijk aan de weergave in de analyse pagina:
+    eerst long entry, dan short entry, dan exit.
+
+    Returns:
+        str of None: LONG, SHORT, EXIT of None (geen duidelijk signaal)
+    """
+    if zscore < -entry_threshold:
+        return LONG
+    if zscore > entry_threshold:
+        return SHORT
+    if abs(zscore) < exit_threshold:
+        return EXIT
+    return None
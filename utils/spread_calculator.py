@@ -1,25 +1,20 @@
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-import streamlit as st
+from utils.regression import fit_ols
 
 def calculate_spread(df):
     """Bereken spread en trading signalen"""
     try:
-        # Linear regression model
-        X = df['price1'].values.reshape(-1, 1)
-        y = df['price2'].values
-        model = LinearRegression().fit(X, y)
+        # Lineaire regressie (gesloten vorm)
+        model = fit_ols(df['price1'].values, df['price2'].values)
         
         # Bereken spread en z-score
-        df['spread'] = df['price2'] - (model.intercept_ + model.coef_[0] * df['price1'])
+        df['spread'] = df['price2'] - (model['alpha'] + model['beta'] * df['price1'])
         df['zscore'] = (df['spread'] - df['spread'].mean()) / df['spread'].std()
         
-        return df, {
-            'alpha': model.intercept_,
-            'beta': model.coef_[0],
-            'r_squared': model.score(X, y)
-        }
+        return df, model
     except Exception as e:
+        # Alleen de UI toont deze fout; scan workers laden geen streamlit
+        import streamlit as st
         st.error(f"Spread berekeningsfout: {str(e)}")
         return df, {}
@@ -0,0 +1,154 @@
+"""
+Synthetische, gecointegreerde markten voor load- en schaaltests
+
+Activeer in de app met PAIRY_DATA_SOURCE=synthetic. Dezelfde seed geeft
+altijd dezelfde prijzen; alleen de tijd-as schuift mee met vandaag.
+
+Model per asset (in log-prijs):
+    log p = log p0 + beta(t) * factor + c * OU + (1 - c) * random walk
+
+Assets in hetzelfde cluster delen één factor en zijn daardoor
+gecointegreerd met sterkte c (1 = stationaire spread, 0 = geen
+cointegratie). Beta's springen bij regime breaks, volatiliteit volgt
+een langzaam wisselend regime en losse bars kunnen ontbreken (gaps).
+"""
+import os
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.resample import INTERVAL_MINUTES, INTERVAL_RULES, PERIOD_DAYS
+
+def _ar1(shocks, phi):
+    """AR(1) proces x_t = phi * x_{t-1} + e_t, kolomsgewijs via pandas ewm"""
+    if phi <= 0:
+        return shocks
+    alpha = 1.0 - phi
+    scaled = shocks / alpha
+    # ewm start op de eerste invoer zelf: x_0 = e_0, niet e_0 / alpha
+    scaled[0] = shocks[0]
+    return pd.DataFrame(scaled).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+def generate_market(n_assets, n_bars, freq='1D', end=None, seed=0, tickers=None,
+                    cluster_size=4, cointegration=0.9, half_life=10, volatility=0.03,
+                    spread_volatility=0.05, vol_persistence=0.99, vol_of_vol=0.1,
+                    n_breaks=0, break_size=0.3, gap_prob=0.0, dtype=np.float64):
+    """
+    Genereer een reproduceerbare markt met slotkoersen
+
+    Args:
+        n_assets (int): Aantal assets
+        n_bars (int): Aantal bars
+        freq (str): Pandas frequentie van de bars
+        end: Laatste tijdstip (standaard vandaag)
+        seed (int): Random seed
+        tickers (list): Kolomnamen (standaard SYN0, SYN1, ...)
+        cluster_size (int): Aantal assets per gedeelde factor
+        cointegration (float): Sterkte 0..1 van de cointegratie binnen een cluster
+        half_life (float): Halfwaardetijd (dagen) van de mean-reverting spread
+        volatility (float): Factor volatiliteit per dag (log)
+        spread_volatility (float): Stationaire std van de spread (log)
+        vol_persistence (float): AR(1) coëfficiënt van het log-volatiliteitsregime
+        vol_of_vol (float): Schok-grootte van het volatiliteitsregime
+        n_breaks (int): Aantal regime breaks (beta sprongen)
+        break_size (float): Relatieve grootte van een beta sprong
+        gap_prob (float): Kans dat een bar voor een asset ontbreekt
+        dtype: float64 of float32 (halveert geheugen bij grote markten)
+
+    Returns:
+        pd.DataFrame: Index = tijd, kolommen = tickers
+    """
+    rng = np.random.default_rng(seed)
+    tickers = list(tickers) if tickers is not None else [f"SYN{i}" for i in range(n_assets)]
+    n_clusters = max(1, int(np.ceil(n_assets / cluster_size)))
+    cluster = np.arange(n_assets) // cluster_size
+
+    # Volatiliteit en halfwaardetijd zijn per dag, zodat de frequentie
+    # alleen de resolutie verandert en niet het prijsniveau
+    step = np.diff(pd.date_range('2000-01-01', periods=2, freq=freq))[0]
+    bars_per_day = pd.Timedelta('1D') / pd.Timedelta(step)
+    bar_volatility = volatility / np.sqrt(bars_per_day)
+    bar_half_life = half_life * bars_per_day
+
+    # Volatiliteitsregime: langzaam bewegende log-volatiliteit per cluster
+    log_vol = _ar1(rng.normal(0, vol_of_vol, (n_bars, n_clusters)), vol_persistence)
+    vol = bar_volatility * np.exp(log_vol - log_vol.mean(axis=0))
+
+    # Gedeelde factoren (random walks)
+    factors = np.cumsum(rng.normal(0, 1, (n_bars, n_clusters)) * vol, axis=0)
+
+    # Beta per asset, met sprongen bij regime breaks
+    beta = np.tile(rng.uniform(0.5, 1.5, n_assets), (n_bars, 1))
+    if n_breaks > 0:
+        for start in np.sort(rng.integers(1, max(n_bars, 2), n_breaks)):
+            beta[start:] *= 1.0 + rng.normal(0, break_size, n_assets)
+
+    # Mean-reverting spread en niet-gecointegreerde drift
+    phi = 0.5 ** (1.0 / bar_half_life) if bar_half_life > 0 else 0.0
+    ou = _ar1(rng.normal(0, spread_volatility * np.sqrt(1 - phi ** 2), (n_bars, n_assets)), phi)
+    drift_volatility = spread_volatility / np.sqrt(max(bar_half_life, 1))
+    drift = np.cumsum(rng.normal(0, drift_volatility, (n_bars, n_assets)), axis=0)
+
+    log_p0 = rng.uniform(np.log(0.1), np.log(50000), n_assets)
+    log_prices = (
+        log_p0
+        + beta * factors[:, cluster]
+        + cointegration * ou
+        + (1.0 - cointegration) * drift
+    )
+    prices = np.exp(log_prices).astype(dtype, copy=False)
+
+    if gap_prob > 0:
+        prices[rng.random(prices.shape) < gap_prob] = np.nan
+
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    index = pd.date_range(end=end, periods=n_bars, freq=freq, name='Date')
+    return pd.DataFrame(prices, index=index, columns=tickers)
+
+def _settings():
+    """Instellingen van de synthetische bron uit de omgeving"""
+    return {
+        'seed': int(os.environ.get('PAIRY_SYNTHETIC_SEED', 42)),
+        'cointegration': float(os.environ.get('PAIRY_SYNTHETIC_COINTEGRATION', 0.9)),
+        'n_breaks': int(os.environ.get('PAIRY_SYNTHETIC_BREAKS', 0)),
+        'gap_prob': float(os.environ.get('PAIRY_SYNTHETIC_GAPS', 0.0))
+    }
+
+@lru_cache(maxsize=16)
+def _universe(tickers, n_bars, freq, end, seed, cointegration, n_breaks, gap_prob):
+    return generate_market(
+        len(tickers), n_bars, freq=freq, end=end, seed=seed, tickers=tickers,
+        cointegration=cointegration, n_breaks=n_breaks, gap_prob=gap_prob
+    )
+
+def fetch_synthetic(ticker, period, interval):
+    """
+    Synthetische databron met dezelfde interface als fetch_yahoo
+
+    De volledige ticker-universe wordt in één keer gegenereerd, zodat
+    losse aanvragen voor twee tickers onderling gecointegreerd zijn.
+    Een ticker buiten constants/tickers.py krijgt een eigen random
+    stream (afgeleid van seed en ticker), zodat de bekende reeksen niet
+    veranderen; zo'n ticker is met geen andere gecointegreerd.
+    """
+    from constants.tickers import tickers as known_tickers
+
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Onbekende periode '{period}'")
+    if interval not in INTERVAL_RULES:
+        raise ValueError(f"Onbekend interval '{interval}'")
+
+    freq = INTERVAL_RULES[interval]
+    n_bars = PERIOD_DAYS[period] * (24 * 60 // INTERVAL_MINUTES[interval])
+    end = pd.Timestamp.today().floor(freq)
+
+    settings = _settings()
+    universe = tuple(known_tickers.values())
+    if ticker not in universe:
+        universe = (ticker,)
+        settings['seed'] = (settings['seed'], zlib.crc32(ticker.encode('utf-8')))
+
+    market = _universe(universe, n_bars, freq, end, **settings)
+    return market[ticker].dropna().rename('price').to_frame()
@@ -0,0 +1,326 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.pairy', 'ledger.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    coin1 TEXT NOT NULL,
+    coin2 TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    period TEXT,
+    interval TEXT,
+    fingerprint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    n_trades INTEGER,
+    final_value REAL,
+    total_return REAL,
+    equity_index BLOB,
+    equity_values BLOB,
+    UNIQUE (fingerprint, pair, params)
+);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    coin1 TEXT NOT NULL,
+    coin2 TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    entry_date TEXT,
+    exit_date TEXT,
+    position TEXT,
+    entry_zscore REAL,
+    exit_zscore REAL,
+    entry_price1 REAL,
+    entry_price2 REAL,
+    exit_price1 REAL,
+    exit_price2 REAL,
+    coin1_shares REAL,
+    coin2_shares REAL,
+    position_size REAL,
+    pnl REAL,
+    pnl_pct REAL,
+    exit_reason TEXT,
+    days_held INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_pair ON runs(pair);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_trades_run ON trades(run_id);
+CREATE INDEX IF NOT EXISTS idx_trades_pair ON trades(pair);
+CREATE INDEX IF NOT EXISTS idx_trades_coin1 ON trades(coin1);
+CREATE INDEX IF NOT EXISTS idx_trades_coin2 ON trades(coin2);
+CREATE INDEX IF NOT EXISTS idx_trades_entry_date ON trades(entry_date);
+CREATE INDEX IF NOT EXISTS idx_trades_exit_date ON trades(exit_date);
+CREATE INDEX IF NOT EXISTS idx_trades_exit_reason ON trades(exit_reason);
+"""
+
+# Trade dict sleutels (run_backtest) -> kolommen in de trades tabel
+TRADE_COLUMNS = {
+    'Entry Date': 'entry_date',
+    'Exit Date': 'exit_date',
+    'Position': 'position',
+    'Entry Z-score': 'entry_zscore',
+    'Exit Z-score': 'exit_zscore',
+    'Entry Price 1': 'entry_price1',
+    'Entry Price 2': 'entry_price2',
+    'Exit Price 1': 'exit_price1',
+    'Exit Price 2': 'exit_price2',
+    'Coin1 Shares': 'coin1_shares',
+    'Coin2 Shares': 'coin2_shares',
+    'Position Size': 'position_size',
+    'P&L': 'pnl',
+    'P&L %': 'pnl_pct',
+    'Exit Reason': 'exit_reason',
+    'Days Held': 'days_held'
+}
+
+DATE_COLUMNS = ('entry_date', 'exit_date')
+
+def _to_text_date(value):
+    """Sorteerbare tekst-datum (UTC, zonder tijdzone)"""
+    if value is None or pd.isna(value):
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.isoformat(sep=' ')
+
+def _to_sql_value(value):
+    """NumPy scalars omzetten naar Python types voor sqlite3"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def pair_name(coin1, coin2):
+    return f"{coin1}/{coin2}"
+
+class TradeLedger:
+    """
+    Persistente SQLite opslag van backtest runs en hun trades
+
+    Elke run bewaart parameters, data fingerprint en de equity curve;
+    trades zijn geïndexeerd op pair, coins, datums en exit reden zodat
+    queries over duizenden runs snel blijven. Een run met dezelfde
+    fingerprint, pair en parameters wordt maar één keer opgeslagen.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._memory_conn = sqlite3.connect(path, check_same_thread=False) if path == ':memory:' else None
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Verbinding per operatie (thread-safe), één transactie per blok"""
+        if self._memory_conn is not None:
+            with self._lock:
+                with self._memory_conn:
+                    yield self._memory_conn
+            return
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_run(self, coin1, coin2, params, fingerprint, df_result, trades,
+                   period=None, interval=None):
+        """
+        Sla één backtest run met alle trades op
+
+        Returns:
+            int: Id van de (nieuwe of al bestaande) run
+        """
+        return self.record_runs([{
+            'coin1': coin1,
+            'coin2': coin2,
+            'params': params,
+            'fingerprint': fingerprint,
+            'df_result': df_result,
+            'trades': trades,
+            'period': period,
+            'interval': interval
+        }])[0]
+
+    def record_runs(self, runs):
+        """
+        Bulk insert van runs in één transactie
+
+        Args:
+            runs (iterable): Dicts met coin1, coin2, params, fingerprint,
+                df_result, trades en optioneel period/interval
+
+        Returns:
+            list: Run ids in dezelfde volgorde
+        """
+        run_ids = []
+        created_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+
+        with self._connect() as conn:
+            for run in runs:
+                pair = pair_name(run['coin1'], run['coin2'])
+                params = json.dumps(run['params'], sort_keys=True)
+                equity = run['df_result']['portfolio_value']
+                equity_index = equity.index
+                if equity_index.tz is not None:
+                    equity_index = equity_index.tz_convert(None)
+                initial = run['params'].get('initial_capital') or equity.iloc[0]
+                final_value = float(equity.iloc[-1])
+
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO runs (
+                        created_at, coin1, coin2, pair, period, interval, fingerprint,
+                        params, n_trades, final_value, total_return, equity_index, equity_values
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        created_at, run['coin1'], run['coin2'], pair,
+                        run.get('period'), run.get('interval'), run['fingerprint'], params,
+                        len(run['trades']), final_value, (final_value - initial) / initial * 100,
+                        np.asarray(equity_index.as_unit('ns').asi8, dtype=np.int64).tobytes(),
+                        equity.to_numpy(dtype=np.float64).tobytes()
+                    )
+                )
+
+                if cursor.rowcount == 0:
+                    # Al eerder opgeslagen: bestaande id teruggeven
+                    run_ids.append(conn.execute(
+                        "SELECT id FROM runs WHERE fingerprint = ? AND pair = ? AND params = ?",
+                        (run['fingerprint'], pair, params)
+                    ).fetchone()[0])
+                    continue
+
+                run_id = cursor.lastrowid
+                run_ids.append(run_id)
+                conn.executemany(
+                    f"""
+                    INSERT INTO trades (run_id, coin1, coin2, pair, {', '.join(TRADE_COLUMNS.values())})
+                    VALUES ({', '.join('?' * (4 + len(TRADE_COLUMNS)))})
+                    """,
+                    [
+                        (run_id, run['coin1'], run['coin2'], pair) + tuple(
+                            _to_text_date(trade.get(key)) if col in DATE_COLUMNS else _to_sql_value(trade.get(key))
+                            for key, col in TRADE_COLUMNS.items()
+                        )
+                        for trade in run['trades']
+                    ]
+                )
+
+        return run_ids
+
+    def query_trades(self, coin=None, pair=None, exit_reason=None, start=None, end=None,
+                     run_id=None, limit=None):
+        """
+        Zoek trades over alle opgeslagen runs
+
+        Args:
+            coin (str): Ticker die in het pair voorkomt (coin1 of coin2)
+            pair (str): Exact pair, bv. "SOL-USD/ETH-USD"
+            exit_reason (str): Bv. "Stop loss", "Take profit", "Z-score exit"
+            start, end: Grenzen op de entry datum
+            run_id (int): Alleen trades van één run
+            limit (int): Maximum aantal rijen
+
+        Returns:
+            pd.DataFrame: Gevonden trades
+        """
+        where, args = [], []
+        if coin is not None:
+            where.append("(coin1 = ? OR coin2 = ?)")
+            args += [coin, coin]
+        if pair is not None:
+            where.append("pair = ?")
+            args.append(pair)
+        if exit_reason is not None:
+            where.append("exit_reason = ?")
+            args.append(exit_reason)
+        if start is not None:
+            where.append("entry_date >= ?")
+            args.append(_to_text_date(start))
+        if end is not None:
+            where.append("entry_date <= ?")
+            args.append(_to_text_date(end))
+        if run_id is not None:
+            where.append("run_id = ?")
+            args.append(run_id)
+
+        sql = "SELECT * FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY entry_date"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=args)
+        for col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col])
+        return df
+
+    def query_runs(self, coin=None, pair=None, limit=None):
+        """Overzicht van opgeslagen runs (zonder equity curve)"""
+        where, args = [], []
+        if coin is not None:
+            where.append("(coin1 = ? OR coin2 = ?)")
+            args += [coin, coin]
+        if pair is not None:
+            where.append("pair = ?")
+            args.append(pair)
+
+        sql = (
+            "SELECT id, created_at, coin1, coin2, pair, period, interval, fingerprint, "
+            "params, n_trades, final_value, total_return FROM runs"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=args)
+        df['params'] = df['params'].map(json.loads)
+        return df
+
+    def equity_curve(self, run_id):
+        """Equity curve van een run als pd.Series"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT equity_index, equity_values FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Run {run_id} niet gevonden")
+        index = pd.to_datetime(np.frombuffer(row[0], dtype=np.int64))
+        return pd.Series(np.frombuffer(row[1], dtype=np.float64), index=index, name='portfolio_value')
+
+_default_ledger = None
+_default_lock = threading.Lock()
+
+def get_trade_ledger():
+    """Proces-brede ledger; pad in te stellen via PAIRY_LEDGER_PATH"""
+    global _default_ledger
+    with _default_lock:
+        if _default_ledger is None:
+            _default_ledger = TradeLedger(os.environ.get('PAIRY_LEDGER_PATH', DEFAULT_PATH))
+        return _default_ledger